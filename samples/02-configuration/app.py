@@ -5,10 +5,17 @@ Demonstrates clean configuration using only environment variables.
 This is the recommended approach for production applications.
 """
 
+import asyncio
+import os
+
+import orjson
 from fastapi import FastAPI
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse, Response
 from githubapp import GitHubApp
 
-app = FastAPI()
+app = FastAPI(default_response_class=ORJSONResponse)
+app.add_middleware(GZipMiddleware, minimum_size=500, compresslevel=6)
 
 # Initialize config for environment variable loading
 app.config = {}
@@ -18,66 +25,88 @@ GitHubApp.load_env(app)
 github_app = GitHubApp(app)
 
 
-@app.get("/")
-def home():
-    """Configuration status."""
-    return {
+_HOME_BYTES = orjson.dumps(
+    {
         "app": "Configuration Examples - Environment Variables",
         "configuration_method": "environment_variables",
         "github_app_id": app.config.get("GITHUBAPP_ID"),
         "status": "ready",
     }
+)
+
+
+@app.get("/")
+def home() -> Response:
+    """Configuration status."""
+    return Response(_HOME_BYTES, media_type="application/json")
+
+
+_HEALTH_BYTES = orjson.dumps({"status": "ok"})
 
 
 @app.get("/health")
-def health():
+def health() -> Response:
     """Health check endpoint."""
-    return {"status": "ok"}
+    return Response(_HEALTH_BYTES, media_type="application/json")
 
 
 @github_app.on("issues.opened")
-def close_new_issue():
+async def close_new_issue():
     """Automatically close newly opened issues."""
-    owner = github_app.payload["repository"]["owner"]["login"]
-    repo = github_app.payload["repository"]["name"]
-    issue_number = github_app.payload["issue"]["number"]
-
-    client = github_app.client()
-
-    client.issues.create_comment(
-        owner=owner,
-        repo=repo,
-        issue_number=issue_number,
-        body="You've got an issue? I've got a solution! Closing 😈",
-    )
-
-    client.issues.update(
-        owner=owner, repo=repo, issue_number=issue_number, state="closed"
+    event = github_app.webhook_event
+
+    client = await github_app.async_client()
+
+    await asyncio.gather(
+        client.issues.create_comment(
+            owner=event.owner,
+            repo=event.repo,
+            issue_number=event.number,
+            body="You've got an issue? I've got a solution! Closing 😈",
+        ),
+        client.issues.update(
+            owner=event.owner,
+            repo=event.repo,
+            issue_number=event.number,
+            state="closed",
+        ),
     )
 
 
 @github_app.on("issues.reopened")
-def close_reopened_issue():
+async def close_reopened_issue():
     """Close reopened issues."""
-    owner = github_app.payload["repository"]["owner"]["login"]
-    repo = github_app.payload["repository"]["name"]
-    issue_number = github_app.payload["issue"]["number"]
-
-    client = github_app.client()
-
-    client.issues.create_comment(
-        owner=owner,
-        repo=repo,
-        issue_number=issue_number,
-        body="Nice try! Closing again. 😈",
-    )
-
-    client.issues.update(
-        owner=owner, repo=repo, issue_number=issue_number, state="closed"
+    event = github_app.webhook_event
+
+    client = await github_app.async_client()
+
+    await asyncio.gather(
+        client.issues.create_comment(
+            owner=event.owner,
+            repo=event.repo,
+            issue_number=event.number,
+            body="Nice try! Closing again. 😈",
+        ),
+        client.issues.update(
+            owner=event.owner,
+            repo=event.repo,
+            issue_number=event.number,
+            state="closed",
+        ),
     )
 
 
 if __name__ == "__main__":
     import uvicorn
 
-    uvicorn.run(app, host="0.0.0.0", port=5001, reload=True)
+    workers = int(os.getenv("WEB_CONCURRENCY", (os.cpu_count() or 1) * 2 + 1))
+
+    uvicorn.run(
+        "app:app",
+        host="0.0.0.0",
+        port=5001,
+        workers=workers,
+        loop="uvloop",
+        http="httptools",
+        log_level="warning",
+    )
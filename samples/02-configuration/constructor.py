@@ -5,89 +5,142 @@ Demonstrates configuration using constructor parameters.
 Less flexible than environment variables but useful in some scenarios.
 """
 
+import asyncio
+from dataclasses import dataclass, field
+from typing import Optional
+
+import orjson
 from fastapi import FastAPI
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse, Response
 from githubapp import GitHubApp
 import os
 
 
-def _env_bytes(name: str):
-    """Helper to convert environment variable to bytes if needed."""
+def _env_bytes(name: str) -> Optional[bytes]:
+    """Read an environment variable as bytes, or None when unset."""
     val = os.getenv(name)
-    return val.encode() if isinstance(val, str) else val
+    return val.encode() if val is not None else None
+
+
+@dataclass(frozen=True)
+class GhSettings:
+    """GitHub App settings, read from the environment once at import."""
+
+    githubapp_id: Optional[int]
+    githubapp_private_key: Optional[bytes] = field(repr=False)
+    githubapp_webhook_secret: Optional[bytes] = field(repr=False)
+    githubapp_webhook_path: str
 
+    @classmethod
+    def from_env(cls) -> "GhSettings":
+        return cls(
+            githubapp_id=int(os.getenv("GITHUBAPP_ID", "0")) or None,
+            githubapp_private_key=_env_bytes("GITHUBAPP_PRIVATE_KEY"),
+            githubapp_webhook_secret=_env_bytes("GITHUBAPP_WEBHOOK_SECRET"),
+            githubapp_webhook_path=os.getenv(
+                "GITHUBAPP_WEBHOOK_PATH", "/webhooks/github/"
+            ),
+        )
 
-app = FastAPI()
+
+settings = GhSettings.from_env()
+
+app = FastAPI(default_response_class=ORJSONResponse)
+app.add_middleware(GZipMiddleware, minimum_size=500, compresslevel=6)
 
 # Constructor Parameters approach
 github_app = GitHubApp(
     app,
-    github_app_id=int(os.getenv("GITHUBAPP_ID", "0")) or None,
-    github_app_key=_env_bytes("GITHUBAPP_PRIVATE_KEY"),
-    github_app_secret=_env_bytes("GITHUBAPP_WEBHOOK_SECRET"),
-    github_app_route=os.getenv("GITHUBAPP_WEBHOOK_PATH", "/webhooks/github/"),
+    github_app_id=settings.githubapp_id,
+    github_app_key=settings.githubapp_private_key,
+    github_app_secret=settings.githubapp_webhook_secret,
+    github_app_route=settings.githubapp_webhook_path,
 )
 
 
-@app.get("/")
-def home():
-    """Configuration status."""
-    return {
+_HOME_BYTES = orjson.dumps(
+    {
         "app": "Configuration Examples - Constructor Parameters",
         "configuration_method": "constructor_parameters",
-        "github_app_id": os.getenv("GITHUBAPP_ID"),
+        "github_app_id": settings.githubapp_id,
         "status": "ready",
     }
+)
+
+
+@app.get("/")
+def home() -> Response:
+    """Configuration status."""
+    return Response(_HOME_BYTES, media_type="application/json")
+
+
+_HEALTH_BYTES = orjson.dumps({"status": "ok"})
 
 
 @app.get("/health")
-def health():
+def health() -> Response:
     """Health check endpoint."""
-    return {"status": "ok"}
+    return Response(_HEALTH_BYTES, media_type="application/json")
 
 
 @github_app.on("issues.opened")
-def close_new_issue():
+async def close_new_issue():
     """Automatically close newly opened issues."""
-    owner = github_app.payload["repository"]["owner"]["login"]
-    repo = github_app.payload["repository"]["name"]
-    issue_number = github_app.payload["issue"]["number"]
-
-    client = github_app.client()
-
-    client.issues.create_comment(
-        owner=owner,
-        repo=repo,
-        issue_number=issue_number,
-        body="You've got an issue? I've got a solution! Closing 😈",
-    )
-
-    client.issues.update(
-        owner=owner, repo=repo, issue_number=issue_number, state="closed"
+    event = github_app.webhook_event
+
+    client = await github_app.async_client()
+
+    await asyncio.gather(
+        client.issues.create_comment(
+            owner=event.owner,
+            repo=event.repo,
+            issue_number=event.number,
+            body="You've got an issue? I've got a solution! Closing 😈",
+        ),
+        client.issues.update(
+            owner=event.owner,
+            repo=event.repo,
+            issue_number=event.number,
+            state="closed",
+        ),
     )
 
 
 @github_app.on("issues.reopened")
-def close_reopened_issue():
+async def close_reopened_issue():
     """Close reopened issues."""
-    owner = github_app.payload["repository"]["owner"]["login"]
-    repo = github_app.payload["repository"]["name"]
-    issue_number = github_app.payload["issue"]["number"]
-
-    client = github_app.client()
-
-    client.issues.create_comment(
-        owner=owner,
-        repo=repo,
-        issue_number=issue_number,
-        body="Nice try! Closing again. 😈",
-    )
-
-    client.issues.update(
-        owner=owner, repo=repo, issue_number=issue_number, state="closed"
+    event = github_app.webhook_event
+
+    client = await github_app.async_client()
+
+    await asyncio.gather(
+        client.issues.create_comment(
+            owner=event.owner,
+            repo=event.repo,
+            issue_number=event.number,
+            body="Nice try! Closing again. 😈",
+        ),
+        client.issues.update(
+            owner=event.owner,
+            repo=event.repo,
+            issue_number=event.number,
+            state="closed",
+        ),
     )
 
 
 if __name__ == "__main__":
     import uvicorn
 
-    uvicorn.run(app, host="0.0.0.0", port=8000, reload=True)
+    workers = int(os.getenv("WEB_CONCURRENCY", (os.cpu_count() or 1) * 2 + 1))
+
+    uvicorn.run(
+        "constructor:app",
+        host="0.0.0.0",
+        port=8000,
+        workers=workers,
+        loop="uvloop",
+        http="httptools",
+        log_level="warning",
+    )
@@ -5,11 +5,17 @@ Demonstrates issue auto-closing with OAuth2 user authentication capabilities.
 Shows how to add user login/logout and protected endpoints to a GitHub App.
 """
 
+import asyncio
+import os
+
+import orjson
 from fastapi import FastAPI, Depends, HTTPException
-from fastapi.responses import HTMLResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import HTMLResponse, ORJSONResponse, Response
 from githubapp import GitHubApp
 
-app = FastAPI()
+app = FastAPI(default_response_class=ORJSONResponse)
+app.add_middleware(GZipMiddleware, minimum_size=500, compresslevel=6)
 
 # Initialize config for environment variable loading
 app.config = {}
@@ -19,13 +25,7 @@ GitHubApp.load_env(app)
 github_app = GitHubApp(app)
 
 
-@app.get("/", response_class=HTMLResponse)
-def home():
-    """Home page with OAuth2 login option."""
-    oauth_configured = github_app.oauth is not None
-
-    if oauth_configured:
-        return """
+_OAUTH_HOME_HTML = """
         <!DOCTYPE html>
         <html>
         <head><title>OAuth2 GitHub App</title></head>
@@ -42,8 +42,8 @@ def home():
         </body>
         </html>
         """
-    else:
-        return """
+
+_NO_OAUTH_HOME_HTML = """
         <!DOCTYPE html>
         <html>
         <head><title>OAuth2 GitHub App</title></head>
@@ -60,37 +60,54 @@ def home():
         </html>
         """
 
+# The OAuth2 configuration is fixed once the app starts, so pick and encode
+# the home page a single time instead of on every request
+_HOME_HTML_BYTES = (
+    _OAUTH_HOME_HTML if github_app.oauth is not None else _NO_OAUTH_HOME_HTML
+).encode()
 
-@app.get("/health")
-def health():
-    """Health check endpoint."""
-    return {
+
+@app.get("/", response_class=HTMLResponse)
+def home() -> Response:
+    """Home page with OAuth2 login option."""
+    return HTMLResponse(_HOME_HTML_BYTES)
+
+
+_HEALTH_BYTES = orjson.dumps(
+    {
         "status": "ok",
         "oauth_configured": github_app.oauth is not None,
         "github_app_id": app.config.get("GITHUBAPP_ID"),
     }
+)
+
+
+@app.get("/health")
+def health() -> Response:
+    """Health check endpoint."""
+    return Response(_HEALTH_BYTES, media_type="application/json")
 
 
 @app.get("/profile")
-def profile(current_user=Depends(github_app.get_current_user)):
+def profile(current_user=Depends(github_app.get_current_user)) -> Response:
     """Protected profile endpoint requiring GitHub authentication."""
-    return {
-        "user": current_user.get("login"),
-        "user_id": current_user.get("sub"),
-        "name": current_user.get("name"),
-        "email": current_user.get("email"),
-        "avatar_url": current_user.get("avatar_url"),
-    }
+    return ORJSONResponse(
+        {
+            "user": current_user.get("login"),
+            "user_id": current_user.get("sub"),
+            "name": current_user.get("name"),
+            "email": current_user.get("email"),
+            "avatar_url": current_user.get("avatar_url"),
+        }
+    )
 
 
 @github_app.on("issues.opened")
-def close_new_issue():
+async def close_new_issue():
     """Automatically close newly opened issues with OAuth2-aware comment."""
-    owner = github_app.payload["repository"]["owner"]["login"]
-    repo = github_app.payload["repository"]["name"]
-    issue_number = github_app.payload["issue"]["number"]
+    event = github_app.webhook_event
 
-    client = github_app.client()
+    client = await github_app.async_client()
 
     # Get current authenticated user if available
     try:
@@ -101,37 +118,55 @@ def close_new_issue():
     except:
         comment = "You've got an issue? I've got a solution! Closing 😈"
 
-    client.issues.create_comment(
-        owner=owner, repo=repo, issue_number=issue_number, body=comment
-    )
-
-    client.issues.update(
-        owner=owner, repo=repo, issue_number=issue_number, state="closed"
+    await asyncio.gather(
+        client.issues.create_comment(
+            owner=event.owner, repo=event.repo, issue_number=event.number, body=comment
+        ),
+        client.issues.update(
+            owner=event.owner,
+            repo=event.repo,
+            issue_number=event.number,
+            state="closed",
+        ),
     )
 
 
 @github_app.on("issues.reopened")
-def close_reopened_issue():
+async def close_reopened_issue():
     """Close reopened issues with OAuth2-aware comment."""
-    owner = github_app.payload["repository"]["owner"]["login"]
-    repo = github_app.payload["repository"]["name"]
-    issue_number = github_app.payload["issue"]["number"]
+    event = github_app.webhook_event
 
-    client = github_app.client()
+    client = await github_app.async_client()
 
     # OAuth2-aware comment
     comment = "Nice try! Closing again. 😈 (OAuth2-enabled)"
 
-    client.issues.create_comment(
-        owner=owner, repo=repo, issue_number=issue_number, body=comment
-    )
-
-    client.issues.update(
-        owner=owner, repo=repo, issue_number=issue_number, state="closed"
+    await asyncio.gather(
+        client.issues.create_comment(
+            owner=event.owner, repo=event.repo, issue_number=event.number, body=comment
+        ),
+        client.issues.update(
+            owner=event.owner,
+            repo=event.repo,
+            issue_number=event.number,
+            state="closed",
+        ),
     )
 
 
 if __name__ == "__main__":
     import uvicorn
 
-    uvicorn.run(app, host="0.0.0.0", port=8000, reload=True)
+    # OAuth2 login state is kept in process memory, so the callback must reach
+    # the worker that started the login; run one worker unless told otherwise
+    workers = int(os.getenv("WEB_CONCURRENCY", 1))
+
+    uvicorn.run(
+        "app:app",
+        host="0.0.0.0",
+        port=8000,
+        workers=workers,
+        loop="uvloop",
+        http="httptools",
+        log_level="warning",
+    )
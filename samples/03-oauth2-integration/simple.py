@@ -2,10 +2,17 @@
 Simple OAuth2 integration example using environment-only configuration.
 """
 
+import asyncio
+import os
+
+import orjson
 from fastapi import FastAPI, Depends
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse, Response
 from githubapp import GitHubApp
 
-app = FastAPI()
+app = FastAPI(default_response_class=ORJSONResponse)
+app.add_middleware(GZipMiddleware, minimum_size=500, compresslevel=6)
 
 # Initialize config for environment variable loading
 app.config = {}
@@ -15,66 +22,89 @@ GitHubApp.load_env(app)
 github_app = GitHubApp(app)
 
 
-@app.get("/")
-def home():
-    """App status."""
-    return {
+_HOME_BYTES = orjson.dumps(
+    {
         "app": "Simple OAuth2 Integration",
         "oauth_configured": github_app.oauth is not None,
         "github_app_id": app.config.get("GITHUBAPP_ID"),
     }
+)
+
+
+@app.get("/")
+def home() -> Response:
+    """App status."""
+    return Response(_HOME_BYTES, media_type="application/json")
 
 
 @app.get("/profile")
-def profile(current_user=Depends(github_app.get_current_user)):
+def profile(current_user=Depends(github_app.get_current_user)) -> Response:
     """Protected endpoint requiring GitHub authentication."""
-    return {"user": current_user.get("login"), "user_id": current_user.get("sub")}
+    return ORJSONResponse(
+        {"user": current_user.get("login"), "user_id": current_user.get("sub")}
+    )
 
 
 @github_app.on("issues.opened")
-def close_new_issue():
+async def close_new_issue():
     """Automatically close newly opened issues."""
-    owner = github_app.payload["repository"]["owner"]["login"]
-    repo = github_app.payload["repository"]["name"]
-    issue_number = github_app.payload["issue"]["number"]
-
-    client = github_app.client()
-
-    # Add comment and close issue
-    client.issues.create_comment(
-        owner=owner,
-        repo=repo,
-        issue_number=issue_number,
-        body="You've got an issue? I've got a solution! Closing 😈",
-    )
-
-    client.issues.update(
-        owner=owner, repo=repo, issue_number=issue_number, state="closed"
+    event = github_app.webhook_event
+
+    client = await github_app.async_client()
+
+    # Add comment and close issue concurrently
+    await asyncio.gather(
+        client.issues.create_comment(
+            owner=event.owner,
+            repo=event.repo,
+            issue_number=event.number,
+            body="You've got an issue? I've got a solution! Closing 😈",
+        ),
+        client.issues.update(
+            owner=event.owner,
+            repo=event.repo,
+            issue_number=event.number,
+            state="closed",
+        ),
     )
 
 
 @github_app.on("issues.reopened")
-def close_reopened_issue():
+async def close_reopened_issue():
     """Close reopened issues."""
-    owner = github_app.payload["repository"]["owner"]["login"]
-    repo = github_app.payload["repository"]["name"]
-    issue_number = github_app.payload["issue"]["number"]
-
-    client = github_app.client()
-
-    client.issues.create_comment(
-        owner=owner,
-        repo=repo,
-        issue_number=issue_number,
-        body="Nice try! Closing again. 😈",
-    )
-
-    client.issues.update(
-        owner=owner, repo=repo, issue_number=issue_number, state="closed"
+    event = github_app.webhook_event
+
+    client = await github_app.async_client()
+
+    await asyncio.gather(
+        client.issues.create_comment(
+            owner=event.owner,
+            repo=event.repo,
+            issue_number=event.number,
+            body="Nice try! Closing again. 😈",
+        ),
+        client.issues.update(
+            owner=event.owner,
+            repo=event.repo,
+            issue_number=event.number,
+            state="closed",
+        ),
     )
 
 
 if __name__ == "__main__":
     import uvicorn
 
-    uvicorn.run(app, host="0.0.0.0", port=8000, reload=True)
+    # OAuth2 login state is kept in process memory, so the callback must reach
+    # the worker that started the login; run one worker unless told otherwise
+    workers = int(os.getenv("WEB_CONCURRENCY", 1))
+
+    uvicorn.run(
+        "simple:app",
+        host="0.0.0.0",
+        port=8000,
+        workers=workers,
+        loop="uvloop",
+        http="httptools",
+        log_level="warning",
+    )
@@ -4,10 +4,41 @@ Advanced GitHub App features demonstration.
 Shows rate limiting, retry logic, and error handling with issue auto-closing.
 """
 
+import asyncio
+import os
+import time
+from contextlib import asynccontextmanager
+
+import orjson
 from fastapi import FastAPI
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse, Response
 from githubapp import GitHubApp, with_rate_limit_handling
 
-app = FastAPI()
+# Maximum number of concurrent label creation requests per repository
+LABEL_CREATE_CONCURRENCY = 5
+# Seconds a fetched rate limit status is served before it is refreshed
+RATE_LIMIT_STATUS_TTL = 30
+_rate_limit_cache = {"value": None, "expires": 0.0, "refresh": None}
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Keep the rate limit status warm so the first request does not wait
+    refresher = asyncio.create_task(_refresh_rate_limit_status_periodically())
+    try:
+        yield
+    finally:
+        # Stop refreshing before GitHubApp closes its HTTP client
+        tasks = [refresher, _rate_limit_cache["refresh"]]
+        tasks = [task for task in tasks if task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+app = FastAPI(default_response_class=ORJSONResponse, lifespan=lifespan)
+app.add_middleware(GZipMiddleware, minimum_size=500, compresslevel=6)
 
 # Initialize config for environment variable loading
 app.config = {}
@@ -21,10 +52,8 @@ github_app = GitHubApp(
 )
 
 
-@app.get("/")
-def home():
-    """Status endpoint."""
-    return {
+_HOME_BYTES = orjson.dumps(
+    {
         "app": "Advanced GitHub App Features",
         "github_app_id": app.config.get("GITHUBAPP_ID"),
         "features": [
@@ -35,119 +64,134 @@ def home():
         ],
         "status": "ready",
     }
+)
+
+
+@app.get("/")
+def home() -> Response:
+    """Status endpoint."""
+    return Response(_HOME_BYTES, media_type="application/json")
+
+
+_HEALTH_BYTES = orjson.dumps({"status": "ok"})
 
 
 @app.get("/health")
-def health():
+def health() -> Response:
     """Health check endpoint."""
-    return {"status": "ok"}
+    return Response(_HEALTH_BYTES, media_type="application/json")
 
 
 @github_app.on("issues.opened")
 @with_rate_limit_handling(github_app)
-def close_new_issue():
+async def close_new_issue():
     """
     Automatically close newly opened issues with rate limit protection.
 
     The @with_rate_limit_handling decorator ensures all GitHub API calls
     will automatically handle rate limits with exponential backoff.
     """
-    owner = github_app.payload["repository"]["owner"]["login"]
-    repo = github_app.payload["repository"]["name"]
-    issue_number = github_app.payload["issue"]["number"]
+    event = github_app.webhook_event
 
     # Get rate-limited client
-    client = github_app.client()
+    client = await github_app.async_client()
 
     # These API calls will automatically retry on rate limits
-    client.issues.create_comment(
-        owner=owner,
-        repo=repo,
-        issue_number=issue_number,
-        body="You've got an issue? I've got a solution! Closing 😈",
-    )
-
-    client.issues.update(
-        owner=owner, repo=repo, issue_number=issue_number, state="closed"
+    await asyncio.gather(
+        client.issues.create_comment(
+            owner=event.owner,
+            repo=event.repo,
+            issue_number=event.number,
+            body="You've got an issue? I've got a solution! Closing 😈",
+        ),
+        client.issues.update(
+            owner=event.owner,
+            repo=event.repo,
+            issue_number=event.number,
+            state="closed",
+        ),
     )
 
 
 @github_app.on("issues.reopened")
 @with_rate_limit_handling(github_app)
-def close_reopened_issue():
+async def close_reopened_issue():
     """Close reopened issues with rate limit protection."""
-    owner = github_app.payload["repository"]["owner"]["login"]
-    repo = github_app.payload["repository"]["name"]
-    issue_number = github_app.payload["issue"]["number"]
-
-    client = github_app.client()
-
-    client.issues.create_comment(
-        owner=owner,
-        repo=repo,
-        issue_number=issue_number,
-        body="Nice try! Closing again. 😈",
-    )
-
-    client.issues.update(
-        owner=owner, repo=repo, issue_number=issue_number, state="closed"
+    event = github_app.webhook_event
+
+    client = await github_app.async_client()
+
+    await asyncio.gather(
+        client.issues.create_comment(
+            owner=event.owner,
+            repo=event.repo,
+            issue_number=event.number,
+            body="Nice try! Closing again. 😈",
+        ),
+        client.issues.update(
+            owner=event.owner,
+            repo=event.repo,
+            issue_number=event.number,
+            state="closed",
+        ),
     )
 
 
 @github_app.on("pull_request.opened")
 @with_rate_limit_handling(github_app)
-def handle_pull_request():
+async def handle_pull_request():
     """
     Handle new pull requests with multiple API calls and rate limiting.
 
-    Demonstrates rate limiting with multiple sequential API operations.
+    Demonstrates rate limiting with multiple concurrent API operations.
     """
-    owner = github_app.payload["repository"]["owner"]["login"]
-    repo = github_app.payload["repository"]["name"]
-    pr_number = github_app.payload["pull_request"]["number"]
-    pr_title = github_app.payload["pull_request"]["title"]
-
-    client = github_app.client()
-
-    # Multiple API calls that could hit rate limits
-    client.issues.create_comment(
-        owner=owner,
-        repo=repo,
-        issue_number=pr_number,
-        body=f"Thanks for the PR '{pr_title}'! All API calls are rate-limit protected.",
+    event = github_app.webhook_event
+    pr_title = event.payload["pull_request"]["title"]
+
+    client = await github_app.async_client()
+
+    async def add_labels():
+        # Add labels (this could trigger rate limits with many PRs)
+        try:
+            await client.issues.add_labels(
+                owner=event.owner,
+                repo=event.repo,
+                issue_number=event.number,
+                labels=["needs-review", "auto-processed"],
+            )
+        except Exception:
+            # Labels might not exist, that's ok
+            pass
+
+    # Independent API calls that could hit rate limits, sent concurrently
+    await asyncio.gather(
+        client.issues.create_comment(
+            owner=event.owner,
+            repo=event.repo,
+            issue_number=event.number,
+            body=f"Thanks for the PR '{pr_title}'! All API calls are rate-limit protected.",
+        ),
+        add_labels(),
     )
 
-    # Add labels (this could trigger rate limits with many PRs)
-    try:
-        client.issues.add_labels(
-            owner=owner,
-            repo=repo,
-            issue_number=pr_number,
-            labels=["needs-review", "auto-processed"],
-        )
-    except Exception:
-        # Labels might not exist, that's ok
-        pass
-
 
 @github_app.on("repository.created")
-def setup_new_repository():
+async def setup_new_repository():
     """
-    Example of manual rate limiting for complex operations.
+    Example of scoped rate limiting for complex operations.
 
-    Shows how to use manual rate limiting for custom logic.
+    Calls made inside `github_app.rate_limited()` are retried individually
+    when GitHub rate limits them, so a retry never repeats earlier steps.
     """
-    owner = github_app.payload["repository"]["owner"]["login"]
-    repo = github_app.payload["repository"]["name"]
+    event = github_app.webhook_event
 
-    def setup_repo():
-        """Setup function that will be wrapped with rate limiting."""
-        client = github_app.client()
+    async with github_app.rate_limited():
+        client = await github_app.async_client()
 
         # Create welcome issue
-        client.issues.create(
-            owner=owner,
-            repo=repo,
+        await client.issues.create(
+            owner=event.owner,
+            repo=event.repo,
             title="Welcome to your new repository!",
             body="This repository has been automatically configured with rate-limited operations.",
         )
@@ -171,29 +215,34 @@ def setup_new_repository():
             },
         ]
 
-        for label in labels_to_create:
-            try:
-                client.issues.create_label(owner=owner, repo=repo, **label)
-            except Exception:
-                # Label might already exist
-                pass
+        # Create labels concurrently, but cap how many requests are in flight
+        # so larger label sets do not trip GitHub's secondary rate limits
+        semaphore = asyncio.Semaphore(LABEL_CREATE_CONCURRENCY)
 
-    # Use manual rate limiting for the entire setup process
-    github_app.retry_with_rate_limit(setup_repo)
+        async def create_label(label):
+            async with semaphore:
+                try:
+                    await client.issues.create_label(
+                        owner=event.owner, repo=event.repo, **label
+                    )
+                except Exception:
+                    pass  # Label might already exist
 
+        await asyncio.gather(*[create_label(label) for label in labels_to_create])
 
-@app.get("/rate-limit-status")
-def rate_limit_status():
-    """
-    Endpoint to check current rate limit status.
 
-    Useful for monitoring and debugging rate limit issues.
-    """
+async def _fetch_rate_limit_status() -> dict:
+    """Query GitHub for the rate limits of the app's first installation."""
     try:
-        client = github_app.client()
+        installations = await asyncio.to_thread(
+            github_app.list_installations, per_page=1
+        )
+        if not installations:
+            return {"error": "No installations found for this GitHub App"}
+        client = await github_app.async_client(installations[0]["id"])
 
         # Make a lightweight API call to check rate limits
-        rate_limit = client.rate_limit.get()
+        rate_limit = await client.rate_limit.get()
 
         return {
             "rate_limit": {
@@ -214,7 +263,56 @@ def rate_limit_status():
         return {"error": f"Could not fetch rate limit status: {str(e)}"}
 
 
+async def _refresh_rate_limit_status():
+    _rate_limit_cache["value"] = await _fetch_rate_limit_status()
+    _rate_limit_cache["expires"] = time.monotonic() + RATE_LIMIT_STATUS_TTL
+
+
+def _schedule_rate_limit_refresh():
+    """Start a refresh unless one is already running; return the refresh task."""
+    task = _rate_limit_cache["refresh"]
+    if task is None or task.done():
+        task = asyncio.create_task(_refresh_rate_limit_status())
+        _rate_limit_cache["refresh"] = task
+    return task
+
+
+async def _refresh_rate_limit_status_periodically():
+    while True:
+        await _schedule_rate_limit_refresh()
+        await asyncio.sleep(RATE_LIMIT_STATUS_TTL)
+
+
+@app.get("/rate-limit-status")
+async def rate_limit_status() -> Response:
+    """
+    Endpoint to check current rate limit status.
+
+    Useful for monitoring and debugging rate limit issues. Serves the last
+    known status and refreshes it in the background once it is older than
+    RATE_LIMIT_STATUS_TTL, so polling this endpoint does not add GitHub calls.
+    """
+    if time.monotonic() >= _rate_limit_cache["expires"]:
+        task = _schedule_rate_limit_refresh()
+        if _rate_limit_cache["value"] is None:
+            # Nothing cached yet; wait for the first result
+            await asyncio.shield(task)
+    return ORJSONResponse(_rate_limit_cache["value"])
+
+
 if __name__ == "__main__":
     import uvicorn
 
-    uvicorn.run(app, host="0.0.0.0", port=8000, reload=True)
+    # Every worker runs its own rate limit refresher, so more workers mean more
+    # GitHub calls; run one worker unless told otherwise
+    workers = int(os.getenv("WEB_CONCURRENCY", 1))
+
+    uvicorn.run(
+        "app:app",
+        host="0.0.0.0",
+        port=8000,
+        workers=workers,
+        loop="uvloop",
+        http="httptools",
+        log_level="warning",
+    )
@@ -4,10 +4,17 @@ Simple rate limiting example.
 Demonstrates basic rate limiting with environment-only configuration.
 """
 
+import asyncio
+import os
+
+import orjson
 from fastapi import FastAPI
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse, Response
 from githubapp import GitHubApp, with_rate_limit_handling
 
-app = FastAPI()
+app = FastAPI(default_response_class=ORJSONResponse)
+app.add_middleware(GZipMiddleware, minimum_size=500, compresslevel=6)
 
 # Initialize config for environment variable loading
 app.config = {}
@@ -17,62 +24,81 @@ GitHubApp.load_env(app)
 github_app = GitHubApp(app, rate_limit_retries=3, rate_limit_max_sleep=60)
 
 
-@app.get("/")
-def home():
-    """Status endpoint."""
-    return {
+_HOME_BYTES = orjson.dumps(
+    {
         "app": "Rate Limiting Example",
         "status": "ready",
         "rate_limiting": "enabled",
     }
+)
+
+
+@app.get("/")
+def home() -> Response:
+    """Status endpoint."""
+    return Response(_HOME_BYTES, media_type="application/json")
 
 
 @github_app.on("issues.opened")
 @with_rate_limit_handling(github_app)
-def close_new_issue():
+async def close_new_issue():
     """Close issues with automatic rate limiting."""
-    owner = github_app.payload["repository"]["owner"]["login"]
-    repo = github_app.payload["repository"]["name"]
-    issue_number = github_app.payload["issue"]["number"]
+    event = github_app.webhook_event
 
-    client = github_app.client()
+    client = await github_app.async_client()
 
     # These calls will automatically retry on rate limits
-    client.issues.create_comment(
-        owner=owner,
-        repo=repo,
-        issue_number=issue_number,
-        body="You've got an issue? I've got a solution! Closing 😈",
-    )
-
-    client.issues.update(
-        owner=owner, repo=repo, issue_number=issue_number, state="closed"
+    await asyncio.gather(
+        client.issues.create_comment(
+            owner=event.owner,
+            repo=event.repo,
+            issue_number=event.number,
+            body="You've got an issue? I've got a solution! Closing 😈",
+        ),
+        client.issues.update(
+            owner=event.owner,
+            repo=event.repo,
+            issue_number=event.number,
+            state="closed",
+        ),
     )
 
 
 @github_app.on("issues.reopened")
 @with_rate_limit_handling(github_app)
-def close_reopened_issue():
+async def close_reopened_issue():
     """Close reopened issues with rate limiting."""
-    owner = github_app.payload["repository"]["owner"]["login"]
-    repo = github_app.payload["repository"]["name"]
-    issue_number = github_app.payload["issue"]["number"]
-
-    client = github_app.client()
-
-    client.issues.create_comment(
-        owner=owner,
-        repo=repo,
-        issue_number=issue_number,
-        body="Nice try! Closing again. 😈",
-    )
-
-    client.issues.update(
-        owner=owner, repo=repo, issue_number=issue_number, state="closed"
+    event = github_app.webhook_event
+
+    client = await github_app.async_client()
+
+    await asyncio.gather(
+        client.issues.create_comment(
+            owner=event.owner,
+            repo=event.repo,
+            issue_number=event.number,
+            body="Nice try! Closing again. 😈",
+        ),
+        client.issues.update(
+            owner=event.owner,
+            repo=event.repo,
+            issue_number=event.number,
+            state="closed",
+        ),
     )
 
 
 if __name__ == "__main__":
     import uvicorn
 
-    uvicorn.run(app, host="0.0.0.0", port=8000, reload=True)
+    workers = int(os.getenv("WEB_CONCURRENCY", (os.cpu_count() or 1) * 2 + 1))
+
+    uvicorn.run(
+        "simple:app",
+        host="0.0.0.0",
+        port=8000,
+        workers=workers,
+        loop="uvloop",
+        http="httptools",
+        log_level="warning",
+    )
@@ -1,5 +1,6 @@
 """FastAPI extension for rapid GitHub app development"""
 
+import asyncio
 import logging
 import time
 import hmac
@@ -7,20 +8,48 @@ import hashlib
 import httpx
 import inspect
 import functools
+import orjson
 from fastapi import FastAPI, APIRouter, Request, HTTPException, status, Depends
 from fastapi.responses import JSONResponse
+from fastcore.xtras import dict2obj
 from ghapi.all import GhApi
 from os import environ
+from urllib.parse import quote
 import jwt
 from .oauth import GitHubOAuth2
 from .session import SessionManager
+from collections import OrderedDict
 from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
 
 LOG = logging.getLogger(__name__)
 
 STATUS_FUNC_CALLED = "HIT"
 STATUS_NO_FUNC_CALLED = "MISS"
 
+# Shared connection pool settings for async GitHub API calls
+HTTP_TIMEOUT = httpx.Timeout(connect=3.0, read=10.0, write=10.0, pool=5.0)
+HTTP_LIMITS = httpx.Limits(
+    max_keepalive_connections=50, max_connections=100, keepalive_expiry=60
+)
+# GitHubApp whose rate limit policy applies to async GitHub API calls in the
+# current context; set by GitHubApp.rate_limited()
+_RATE_LIMIT_POLICY = ContextVar("githubapp_rate_limit_policy", default=None)
+
+# Number of installations whose async clients are kept for reuse
+ASYNC_CLIENT_CACHE_SIZE = 128
+# Number of installations whose access tokens are kept for reuse
+INSTALLATION_TOKEN_CACHE_SIZE = 1024
+# Number of (event, action) pairs whose resolved handlers are kept
+DISPATCH_CACHE_SIZE = 256
+# Cached installation tokens are refreshed this many seconds before they expire
+TOKEN_EXPIRY_MARGIN = 60
+# Lifetime of the cached app JWT (GitHub allows at most 10 minutes)
+JWT_EXPIRATION = 540
+
 
 class GitHubAppError(Exception):
     def __init__(self, message="GitHub App error", status=None, data=None):
@@ -62,6 +91,113 @@ class GithubAppUnkownObject(Exception):
         super().__init__(self.message)
 
 
+class RateLimitRetryTransport(httpx.AsyncHTTPTransport):
+    """HTTP transport that retries rate limited GitHub responses.
+
+    Retries only happen inside `GitHubApp.rate_limited()`, using that app's
+    retry count, maximum sleep and GitHub's Retry-After / X-RateLimit-Reset
+    headers. Any other response is returned as soon as it arrives.
+    """
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        response = await super().handle_async_request(request)
+        github_app = _RATE_LIMIT_POLICY.get()
+        if github_app is None:
+            return response
+
+        attempt = 0
+        while (
+            github_app._is_rate_limited(response)
+            and attempt < github_app._rate_limit_retries
+        ):
+            sleep_time = github_app._calculate_retry_delay(response, attempt)
+            if sleep_time > github_app._rate_limit_max_sleep:
+                break
+            await response.aclose()
+            await asyncio.sleep(sleep_time)
+            response = await super().handle_async_request(request)
+            attempt += 1
+        return response
+
+
+class AsyncGhApi(GhApi):
+    """GhApi client whose generated endpoints return awaitables sent with httpx.
+
+    Endpoint groups and signatures are inherited from GhApi, so calls read the
+    same as with the synchronous client:
+
+        await client.issues.create_comment(owner=..., repo=..., issue_number=..., body=...)
+
+    Requests go through `http_client` when given, so connections (and their
+    TLS sessions) are reused across calls; otherwise a client is opened per
+    request. HTTP errors are raised as `httpx.HTTPStatusError`. GhApi's
+    convenience helpers built on top of synchronous calls are not supported.
+    """
+
+    def __init__(self, *args, http_client: httpx.AsyncClient = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._http_client = http_client
+
+    async def __call__(
+        self,
+        path: str,
+        verb: str = None,
+        headers: dict = None,
+        route: dict = None,
+        query: dict = None,
+        data=None,
+        timeout=None,
+        decode=True,
+    ):
+        """Call a fully specified `path` using HTTP `verb` and decode the response."""
+        if verb is None:
+            verb = "POST" if data else "GET"
+        headers = {**self.headers, **(headers or {})}
+        if not path.startswith(("http://", "https://")):
+            path = self.gh_host + path
+        if route:
+            path = path.format(**{k: quote(str(v), safe="") for k, v in route.items()})
+        response = await self._send(
+            verb,
+            path,
+            timeout,
+            headers=headers,
+            params=query or None,
+            json=data or None,
+        )
+        github_app = _RATE_LIMIT_POLICY.get()
+        if github_app is not None and github_app._is_rate_limited(response):
+            # The transport has already used up its retries
+            raise GitHubRateLimitError(
+                message=f"Rate limit exceeded in client call: {verb} {path}",
+                status=response.status_code,
+                data=response.text,
+                rate_limit_info=github_app._extract_rate_limit_info(response),
+            )
+        response.raise_for_status()
+
+        self.recv_hdrs = response.headers
+        if "x-ratelimit-remaining" in response.headers:
+            newlim = response.headers["x-ratelimit-remaining"]
+            if self.limit_cb is not None and newlim != self.limit_rem:
+                self.limit_cb(int(newlim), int(response.headers["x-ratelimit-limit"]))
+            self.limit_rem = newlim
+
+        if not decode:
+            return response.content
+        if "json" in headers["Accept"]:
+            return dict2obj(response.json()) if response.content else None
+        return response.text
+
+    async def _send(self, verb, url, timeout=None, **kwargs) -> httpx.Response:
+        if self._http_client is None:
+            async with httpx.AsyncClient(timeout=timeout) as http:
+                return await http.request(verb, url, **kwargs)
+        if timeout is not None:
+            kwargs["timeout"] = timeout
+        return await self._http_client.request(verb, url, **kwargs)
+
+
 class RateLimitedGhApi:
     """Wrapper for GhApi that adds automatic rate limit handling to all method calls."""
 
@@ -95,9 +231,22 @@ def with_rate_limit_handling(github_app):
             client = github_app.get_client()
             # All client calls automatically have rate limit handling
             client.issues.create_comment(...)
+
+    Coroutine handlers are run inside `github_app.rate_limited()`, so calls on
+    clients returned by `github_app.async_client()` are retried by the shared
+    HTTP transport and back off with `asyncio.sleep`.
     """
 
     def decorator(func):
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                async with github_app.rate_limited():
+                    return await func(*args, **kwargs)
+
+            return async_wrapper
+
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
             # Store original client method
@@ -141,20 +290,66 @@ class GitHubRateLimitError(Exception):
         super().__init__(self.message)
 
 
+@dataclass(frozen=True)
+class WebhookEvent:
+    """Commonly used fields of a webhook delivery, parsed once per request.
+
+    `owner`, `repo` and `number` are None when the payload has no repository
+    or no issue/pull request. The full payload remains available as `payload`.
+    """
+
+    __slots__ = (
+        "name",
+        "action",
+        "delivery_id",
+        "installation_id",
+        "owner",
+        "repo",
+        "number",
+        "payload",
+    )
+
+    name: str
+    action: Optional[str]
+    delivery_id: Optional[str]
+    installation_id: Optional[int]
+    owner: Optional[str]
+    repo: Optional[str]
+    number: Optional[int]
+    payload: dict
+
+    @classmethod
+    def from_payload(cls, name: str, payload: dict, delivery_id: str = None):
+        repository = payload.get("repository") or {}
+        item = payload.get("issue") or payload.get("pull_request") or {}
+        return cls(
+            name=name,
+            action=payload.get("action"),
+            delivery_id=delivery_id,
+            installation_id=(payload.get("installation") or {}).get("id"),
+            owner=(repository.get("owner") or {}).get("login"),
+            repo=repository.get("name"),
+            number=item.get("number"),
+            payload=payload,
+        )
+
+
 class InstallationAuthorization:
     def __init__(self, token: str, expires_at: str = None):
         self.token = token
         self.expires_at = expires_at
 
-    def expired(self) -> bool:
+    def expired(self, margin: int = 0) -> bool:
+        """True once the token expires, or will within `margin` seconds."""
         if self.expires_at is None:
             return False
-        import time
-
-        if isinstance(self.expires_at, str):
-            # Handle ISO format or assume it's a timestamp
-            return False  # Simplified for now
-        return time.time() > self.expires_at
+        expires_at = self.expires_at
+        if isinstance(expires_at, str):
+            # GitHub returns ISO 8601 timestamps such as 2016-07-11T22:14:10Z
+            expires_at = datetime.fromisoformat(
+                expires_at.replace("Z", "+00:00")
+            ).timestamp()
+        return time.time() + margin > expires_at
 
 
 class GitHubApp:
@@ -190,7 +385,22 @@ class GitHubApp:
         rate_limit_max_sleep: int = 60,
     ):
         self._hook_mappings = {}
+        self._dispatch_cache = {}
+        self._hmac_secret = None
+        self._hmac_templates = {}
         self._access_token = None
+        self._http_client = None
+        self._async_clients = OrderedDict()
+        self._installation_tokens = OrderedDict()
+        self._installation_token_locks = {}
+        # WebhookEvent of the delivery being handled in the current context;
+        # per instance so apps don't share it, and per context so concurrent
+        # deliveries don't see each other
+        self._webhook_event = ContextVar(
+            f"githubapp_webhook_event_{id(self)}", default=None
+        )
+        self._jwt = None
+        self._jwt_expires_at = 0
         self.base_url = github_app_url or "https://api.github.com"
         self.id = github_app_id
         self.key = github_app_key
@@ -348,9 +558,16 @@ class GitHubApp:
             )
             return
 
-        # Register router endpoint for GitHub webhook
+        # Register router endpoint for GitHub webhook. It is a plain Starlette
+        # route: the handler reads the raw body itself, so FastAPI's dependency
+        # resolution and response validation would only add overhead.
         self._webhook_route = route or self._webhook_route or "/webhooks/github/"
-        self.router.post(self._webhook_route)(self._handle_request)
+        self.router.add_route(
+            self._webhook_route,
+            self._handle_request,
+            methods=["POST"],
+            include_in_schema=False,
+        )
         app.include_router(self.router)
         # copy config from FastAPI app
         # ensure app has config dict (for backward compatibility)
@@ -408,6 +625,9 @@ class GitHubApp:
         if self._enable_oauth and self.oauth and self._session_mgr:
             self._setup_oauth_routes(app)
 
+        # Ensure pooled http clients are closed via lifespan (no deprecated on_event)
+        self._install_lifespan_cleanup(app)
+
         self._initialized = True
 
     def _setup_oauth_routes(self, app: FastAPI):
@@ -445,15 +665,13 @@ class GitHubApp:
         @router.post("/logout")
         async def oauth_logout():
             # Stateless JWTs: clients drop the token; server may add blacklist if desired.
-            return {"status": "logged_out"}
+            return JSONResponse({"status": "logged_out"})
 
         @router.get("/user")
         async def oauth_user(current=Depends(self.get_current_user)):
-            return current
+            return JSONResponse(current)
 
         app.include_router(router, prefix=prefix, tags=["oauth2"])
-        # Ensure OAuth2 http client is closed via lifespan (no deprecated on_event)
-        self._install_lifespan_cleanup(app)
 
     def _install_lifespan_cleanup(self, app: FastAPI):
         """Install a lifespan context that closes shared resources on shutdown.
@@ -466,22 +684,39 @@ class GitHubApp:
         @asynccontextmanager
         async def lifespan(ap: FastAPI):
             if callable(existing_lifespan):
-                # Chain existing lifespan
-                async with existing_lifespan(ap) as state:
-                    try:
+                # Chain existing lifespan; close only after its shutdown has run
+                # so background tasks it stops cannot reopen the clients
+                try:
+                    async with existing_lifespan(ap) as state:
                         yield state
-                    finally:
-                        if self.oauth and hasattr(self.oauth, "aclose"):
-                            await self.oauth.aclose()
+                finally:
+                    await self.aclose()
             else:
                 try:
                     yield
                 finally:
-                    if self.oauth and hasattr(self.oauth, "aclose"):
-                        await self.oauth.aclose()
+                    await self.aclose()
 
         app.router.lifespan_context = lifespan
 
+    def _get_http_client(self) -> httpx.AsyncClient:
+        if self._http_client is None:
+            self._http_client = httpx.AsyncClient(
+                transport=RateLimitRetryTransport(http2=True, limits=HTTP_LIMITS),
+                timeout=HTTP_TIMEOUT,
+            )
+        return self._http_client
+
+    async def aclose(self) -> None:
+        """Close pooled http connections and drop cached installation clients."""
+        self._async_clients.clear()
+        self._installation_token_locks.clear()
+        if self._http_client is not None:
+            await self._http_client.aclose()
+            self._http_client = None
+        if self.oauth and hasattr(self.oauth, "aclose"):
+            await self.oauth.aclose()
+
     def get_current_user(self, request: Request):
         if not self._session_mgr:
             raise HTTPException(status_code=401, detail="OAuth2 not configured")
@@ -503,16 +738,47 @@ class GitHubApp:
     def installation_token(self):
         return self._access_token
 
-    def client(self, installation_id: int = None):
-        """GitHub client authenticated as GitHub app installation"""
+    @property
+    def webhook_event(self):
+        """WebhookEvent of the delivery being handled, or None outside a webhook."""
+        return self._webhook_event.get()
+
+    @property
+    def payload(self):
+        """Payload of the delivery being handled, or None outside a webhook."""
+        event = self._webhook_event.get()
+        return event.payload if event is not None else None
+
+    @payload.setter
+    def payload(self, payload):
+        self._webhook_event.set(
+            WebhookEvent.from_payload(None, payload) if payload is not None else None
+        )
+
+    @property
+    def event(self):
+        event = self._webhook_event.get()
+        return event.name if event is not None else None
+
+    @property
+    def delivery_id(self):
+        event = self._webhook_event.get()
+        return event.delivery_id if event is not None else None
+
+    def _resolve_installation_id(self, installation_id: int = None) -> int:
         if installation_id is None:
-            try:
-                installation_id = self.payload["installation"]["id"]
-            except Exception:
+            event = self._webhook_event.get()
+            installation_id = event.installation_id if event is not None else None
+            if installation_id is None:
                 raise GitHubAppError(
                     message="Missing installation id; provide installation_id or call within a webhook context",
                     status=400,
                 )
+        return installation_id
+
+    def client(self, installation_id: int = None):
+        """GitHub client authenticated as GitHub app installation"""
+        installation_id = self._resolve_installation_id(installation_id)
         token = self.get_access_token(installation_id).token
         return GhApi(token=token)
 
@@ -520,6 +786,93 @@ class GitHubApp:
         """Alias for client() method for consistency with decorator usage"""
         return self.client(installation_id)
 
+    async def async_client(self, installation_id: int = None):
+        """Async GitHub client authenticated as GitHub app installation.
+
+        Endpoint calls on the returned client must be awaited:
+
+            client = await github_app.async_client()
+            await client.issues.create_comment(...)
+
+        Clients share one pooled http connection and are kept per installation
+        (least recently used first out), so repeated webhooks skip rebuilding
+        the endpoint groups and renegotiating TLS.
+        """
+        installation_id = self._resolve_installation_id(installation_id)
+        token = (await self.async_get_access_token(installation_id)).token
+
+        client = self._async_clients.get(installation_id)
+        if client is None:
+            client = AsyncGhApi(
+                token=token,
+                gh_host=self.base_url,
+                http_client=self._get_http_client(),
+            )
+            self._async_clients[installation_id] = client
+            if len(self._async_clients) > ASYNC_CLIENT_CACHE_SIZE:
+                self._async_clients.popitem(last=False)
+        else:
+            self._async_clients.move_to_end(installation_id)
+            # Installation tokens rotate; refresh the header in place
+            client.headers["Authorization"] = f"token {token}"
+        return client
+
+    def _rate_limit_retry_delay(self, func, error, attempt):
+        """Return seconds to wait before retrying after `error`.
+
+        Returns None when `error` is not a rate limit error, and raises
+        GitHubRateLimitError once retries are exhausted.
+        """
+        # Check if this is a GitHub API rate limit error
+        if hasattr(error, "response"):
+            response = error.response
+        elif hasattr(error, "args") and len(error.args) > 0:
+            # Try to extract response from exception message/args
+            # This handles different exception formats from ghapi
+            response = None
+            if hasattr(error, "code") and error.code in [429, 403]:
+                # Create a mock response object for rate limit detection
+                class MockResponse:
+                    def __init__(self, status_code, headers=None):
+                        self.status_code = status_code
+                        self.headers = headers or {}
+
+                response = MockResponse(error.code, getattr(error, "headers", {}))
+        else:
+            response = None
+
+        # Not a rate limit error
+        if not (response and self._is_rate_limited(response)):
+            return None
+
+        if attempt < self._rate_limit_retries:
+            sleep_time = self._calculate_retry_delay(response, attempt)
+            if sleep_time <= self._rate_limit_max_sleep:
+                return sleep_time
+        # Final attempt or sleep time too long, re-raise with context
+        raise GitHubRateLimitError(
+            message=f"Rate limit exceeded in client call: {func.__name__}",
+            status=getattr(response, "status_code", None),
+            data=str(error),
+            rate_limit_info=self._extract_rate_limit_info(response),
+        ) from error
+
+    @asynccontextmanager
+    async def rate_limited(self):
+        """Retry rate limited calls made by async clients within the block.
+
+            async with github_app.rate_limited():
+                await client.issues.create_comment(...)
+
+        Retries happen in the pooled HTTP transport. Once they are used up, the
+        call raises GitHubRateLimitError.
+        """
+        token = _RATE_LIMIT_POLICY.set(self)
+        try:
+            yield
+        finally:
+            _RATE_LIMIT_POLICY.reset(token)
+
     def retry_with_rate_limit(self, func, *args, **kwargs):
         """Execute a function with automatic rate limit retry handling.
 
@@ -530,44 +883,30 @@ class GitHubApp:
             try:
                 return func(*args, **kwargs)
             except Exception as e:
-                # Check if this is a GitHub API rate limit error
-                if hasattr(e, "response"):
-                    response = e.response
-                elif hasattr(e, "args") and len(e.args) > 0:
-                    # Try to extract response from exception message/args
-                    # This handles different exception formats from ghapi
-                    response = None
-                    if hasattr(e, "code") and e.code in [429, 403]:
-                        # Create a mock response object for rate limit detection
-                        class MockResponse:
-                            def __init__(self, status_code, headers=None):
-                                self.status_code = status_code
-                                self.headers = headers or {}
-
-                        response = MockResponse(e.code, getattr(e, "headers", {}))
-                else:
-                    response = None
-
-                # Check if this is a rate limit error
-                if response and self._is_rate_limited(response):
-                    if attempt < self._rate_limit_retries:
-                        sleep_time = self._calculate_retry_delay(response, attempt)
-                        if sleep_time <= self._rate_limit_max_sleep:
-                            time.sleep(sleep_time)
-                            continue
-                    # Final attempt or sleep time too long, re-raise with context
-                    rate_info = (
-                        self._extract_rate_limit_info(response) if response else {}
-                    )
-                    raise GitHubRateLimitError(
-                        message=f"Rate limit exceeded in client call: {func.__name__}",
-                        status=getattr(response, "status_code", None),
-                        data=str(e),
-                        rate_limit_info=rate_info,
-                    ) from e
+                sleep_time = self._rate_limit_retry_delay(func, e, attempt)
+                if sleep_time is None:
+                    # Not a rate limit error, re-raise immediately
+                    raise
+                time.sleep(sleep_time)
 
-                # Not a rate limit error, re-raise immediately
-                raise
+    async def async_retry_with_rate_limit(self, func, *args, **kwargs):
+        """Async counterpart of retry_with_rate_limit.
+
+        `func` may be a coroutine function or return an awaitable (as
+        AsyncGhApi endpoints do); waits between retries use `asyncio.sleep`.
+        """
+        for attempt in range(self._rate_limit_retries + 1):
+            try:
+                result = func(*args, **kwargs)
+                if inspect.isawaitable(result):
+                    result = await result
+                return result
+            except Exception as e:
+                sleep_time = self._rate_limit_retry_delay(func, e, attempt)
+                if sleep_time is None:
+                    # Not a rate limit error, re-raise immediately
+                    raise
+                await asyncio.sleep(sleep_time)
 
     def _create_jwt(self, expiration=60):
         """
@@ -590,6 +929,68 @@ class GitHubApp:
             encrypted = encrypted.decode("utf-8")
         return encrypted
 
+    def _get_jwt(self):
+        """Return the app JWT, signing a new one only when the cached one nears expiry."""
+        now = time.time()
+        if self._jwt is None or now + TOKEN_EXPIRY_MARGIN > self._jwt_expires_at:
+            self._jwt = self._create_jwt(expiration=JWT_EXPIRATION)
+            self._jwt_expires_at = now + JWT_EXPIRATION
+        return self._jwt
+
+    def _cached_access_token(self, installation_id, user_id=None):
+        """Return a cached installation token that is not about to expire, if any.
+
+        Tokens scoped to a user are never cached.
+        """
+        if user_id is not None:
+            return None
+        auth = self._installation_tokens.get(installation_id)
+        if auth is None or auth.expired(margin=TOKEN_EXPIRY_MARGIN):
+            return None
+        self._installation_tokens.move_to_end(installation_id)
+        return auth
+
+    def _access_token_request(self, installation_id, user_id=None) -> dict:
+        return {
+            "url": f"{self.base_url}/app/installations/{installation_id}/access_tokens",
+            "headers": {
+                "Authorization": f"Bearer {self._get_jwt()}",
+                "Accept": "application/vnd.github.v3+json",
+                "User-Agent": "FastAPI-GithubApp/Python",
+            },
+            "json": {"user_id": user_id} if user_id else {},
+        }
+
+    def _access_token_from_response(self, response):
+        """Build an InstallationAuthorization or raise for a non-rate-limited response."""
+        if response.status_code == 201:
+            return InstallationAuthorization(
+                token=response.json()["token"],
+                expires_at=response.json()["expires_at"],
+            )
+        elif response.status_code == 403:
+            raise GitHubAppBadCredentials(
+                status=response.status_code, data=response.text
+            )
+        elif response.status_code == 404:
+            raise GithubAppUnkownObject(status=response.status_code, data=response.text)
+
+        # Other errors
+        raise GitHubAppError(
+            message="Failed to create installation access token",
+            status=response.status_code,
+            data=response.text,
+        )
+
+    def _access_token_rate_limit_error(self, response):
+        rate_info = self._extract_rate_limit_info(response)
+        return GitHubRateLimitError(
+            message="Rate limit exceeded for installation access token",
+            status=response.status_code,
+            data=response.text,
+            rate_limit_info=rate_info,
+        )
+
     def get_access_token(self, installation_id, user_id=None):
         """
         Get an access token for the given installation id.
@@ -598,17 +999,13 @@ class GitHubApp:
         :param installation_id: int
         :return: :class:`github.InstallationAuthorization.InstallationAuthorization`
         """
-        body = {"user_id": user_id} if user_id else {}
+        auth = self._cached_access_token(installation_id, user_id)
+        if auth is not None:
+            return auth
 
         for attempt in range(self._rate_limit_retries + 1):
             response = httpx.post(
-                f"{self.base_url}/app/installations/{installation_id}/access_tokens",
-                headers={
-                    "Authorization": f"Bearer {self._create_jwt()}",
-                    "Accept": "application/vnd.github.v3+json",
-                    "User-Agent": "FastAPI-GithubApp/Python",
-                },
-                json=body,
+                **self._access_token_request(installation_id, user_id)
             )
 
             # Check for rate limiting
@@ -619,35 +1016,73 @@ class GitHubApp:
                         time.sleep(sleep_time)
                         continue
                 # Final attempt or sleep time too long, raise error
-                rate_info = self._extract_rate_limit_info(response)
-                raise GitHubRateLimitError(
-                    message="Rate limit exceeded for installation access token",
-                    status=response.status_code,
-                    data=response.text,
-                    rate_limit_info=rate_info,
-                )
+                raise self._access_token_rate_limit_error(response)
 
             # Process successful or non-rate-limited error responses
-            if response.status_code == 201:
-                return InstallationAuthorization(
-                    token=response.json()["token"],
-                    expires_at=response.json()["expires_at"],
-                )
-            elif response.status_code == 403:
-                raise GitHubAppBadCredentials(
-                    status=response.status_code, data=response.text
-                )
-            elif response.status_code == 404:
-                raise GithubAppUnkownObject(
-                    status=response.status_code, data=response.text
+            return self._store_access_token(
+                installation_id, user_id, self._access_token_from_response(response)
+            )
+
+    async def async_get_access_token(self, installation_id, user_id=None):
+        """Async counterpart of get_access_token; rate limit waits use `asyncio.sleep`.
+
+        Concurrent requests for the same installation wait on one refresh
+        instead of each minting a token.
+        """
+        auth = self._cached_access_token(installation_id, user_id)
+        if auth is not None:
+            return auth
+        if user_id is not None:
+            return await self._async_fetch_access_token(installation_id, user_id)
+
+        lock = self._installation_token_locks.setdefault(
+            installation_id, asyncio.Lock()
+        )
+        async with lock:
+            # Another task may have refreshed the token while we waited
+            auth = self._cached_access_token(installation_id)
+            if auth is not None:
+                return auth
+            return await self._async_fetch_access_token(installation_id)
+
+    def _store_access_token(self, installation_id, user_id, auth):
+        if user_id is None:
+            self._installation_tokens[installation_id] = auth
+            self._installation_tokens.move_to_end(installation_id)
+            if len(self._installation_tokens) > INSTALLATION_TOKEN_CACHE_SIZE:
+                evicted, _ = self._installation_tokens.popitem(last=False)
+                self._installation_token_locks.pop(evicted, None)
+        return auth
+
+    async def _async_fetch_access_token(self, installation_id, user_id=None):
+        http = self._get_http_client()
+        # Token requests have their own retry loop, so keep the transport from
+        # retrying them as well
+        policy = _RATE_LIMIT_POLICY.set(None)
+        try:
+            for attempt in range(self._rate_limit_retries + 1):
+                response = await http.post(
+                    **self._access_token_request(installation_id, user_id)
                 )
 
-            # Other errors
-            raise GitHubAppError(
-                message="Failed to create installation access token",
-                status=response.status_code,
-                data=response.text,
-            )
+                # Check for rate limiting
+                if self._is_rate_limited(response):
+                    if attempt < self._rate_limit_retries:
+                        sleep_time = self._calculate_retry_delay(response, attempt)
+                        if sleep_time <= self._rate_limit_max_sleep:
+                            await asyncio.sleep(sleep_time)
+                            continue
+                    # Final attempt or sleep time too long, raise error
+                    raise self._access_token_rate_limit_error(response)
+
+                # Process successful or non-rate-limited error responses
+                return self._store_access_token(
+                    installation_id,
+                    user_id,
+                    self._access_token_from_response(response),
+                )
+        finally:
+            _RATE_LIMIT_POLICY.reset(policy)
 
     def list_installations(self, per_page=30, page=1):
         """
@@ -660,7 +1095,7 @@ class GitHubApp:
             response = httpx.get(
                 f"{self.base_url}/app/installations",
                 headers={
-                    "Authorization": f"Bearer {self._create_jwt()}",
+                    "Authorization": f"Bearer {self._get_jwt()}",
                     "Accept": "application/vnd.github.v3+json",
                     "User-Agent": "FastAPI-GithubApp/python",
                 },
@@ -730,6 +1165,7 @@ class GitHubApp:
                 self._hook_mappings[event_action] = [f]
             else:
                 self._hook_mappings[event_action].append(f)
+            self._dispatch_cache.clear()
 
             # make sure the function can still be called normally (e.g. if a user wants to pass in their
             # own Context for whatever reason).
@@ -737,14 +1173,39 @@ class GitHubApp:
 
         return decorator
 
-    async def _extract_payload(self, request: Request) -> dict:
+    def _resolve_handlers(self, event: str, action: str = None) -> tuple:
+        """Handlers for `event` followed by those for `event.action`.
+
+        Returns (function, is_coroutine) pairs. The result is memoized per
+        (event, action) until another handler is registered with `on`.
+        """
+        key = (event, action)
+        handlers = self._dispatch_cache.get(key)
+        if handlers is None:
+            functions = list(self._hook_mappings.get(event, ()))
+            if action:
+                functions += self._hook_mappings.get(f"{event}.{action}", ())
+            handlers = tuple((f, inspect.iscoroutinefunction(f)) for f in functions)
+            if len(self._dispatch_cache) < DISPATCH_CACHE_SIZE:
+                self._dispatch_cache[key] = handlers
+        return handlers
+
+    def _extract_payload(self, body_bytes: bytes) -> dict:
         try:
-            payload = await request.json()
+            payload = orjson.loads(body_bytes)
         except Exception:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail={"status": "ERROR", "description": "Invalid JSON payload."},
             )
+        if not isinstance(payload, dict):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail={
+                    "status": "ERROR",
+                    "description": "JSON payload must be an object.",
+                },
+            )
         if "installation" not in payload:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -755,6 +1216,54 @@ class GitHubApp:
             )
         return payload
 
+    def _signature_hmac(self, secret: bytes, digestmod):
+        """Return a fresh HMAC keyed with `secret`.
+
+        The keyed state is prepared once per secret and digest and copied for
+        each request, which skips re-deriving the padded key every time.
+        """
+        if secret != self._hmac_secret:
+            self._hmac_secret = secret
+            self._hmac_templates = {}
+        template = self._hmac_templates.get(digestmod)
+        if template is None:
+            template = hmac.new(secret, digestmod=digestmod)
+            self._hmac_templates[digestmod] = template
+        return template.copy()
+
+    def _start_signature_check(self, headers):
+        """Prepare to verify the webhook HMAC signature of a delivery.
+
+        Prefers X-Hub-Signature-256 and falls back to the legacy SHA-1 header.
+        Returns (hmac, expected prefix, signature) for the body to be fed into,
+        or None when no webhook secret is configured. Raises a 400 when the
+        signature header is missing.
+        """
+        secret = self.config.get("GITHUBAPP_WEBHOOK_SECRET", None)
+        if secret is False or secret is None:
+            return None
+        if isinstance(secret, str):
+            secret = secret.encode()
+
+        # verify sha256 signature if present, else sha1, else error
+        signature = headers.get("X-Hub-Signature-256")
+        digestmod, prefix = hashlib.sha256, b"sha256="
+        if not signature:
+            signature = headers.get("X-Hub-Signature")
+            digestmod, prefix = hashlib.sha1, b"sha1="
+        if not signature:
+            # missing signature header
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST)
+        return self._signature_hmac(secret, digestmod), prefix, signature
+
+    def _finish_signature_check(self, check) -> None:
+        """Raise a 400 unless the body fed into `check` matches its signature."""
+        mac, prefix, signature = check
+        expected = prefix + mac.hexdigest().encode()
+        # comparing bytes keeps compare_digest from rejecting non-ASCII values
+        if not hmac.compare_digest(expected, signature.encode("latin-1")):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST)
+
     async def _handle_request(self, request: Request):
         # validate HTTP Content-Type header
         content_type = request.headers.get("Content-Type", "")
@@ -769,46 +1278,23 @@ class GitHubApp:
                     "description": "Invalid HTTP Content-Type header for JSON body (must be application/json or application/*+json).",
                 },
             )
-        # signature verification
-        secret = self.config.get("GITHUBAPP_WEBHOOK_SECRET", None)
-        body_bytes = await request.body()
-        if secret is not False and secret is not None:
-            # Convert secret to bytes if it's a string
-            if isinstance(secret, str):
-                secret_bytes = secret.encode()
-            else:
-                secret_bytes = secret
-
-            # verify sha256 signature if present, else sha1, else error
-            sig256 = request.headers.get("X-Hub-Signature-256")
-            sig1 = request.headers.get("X-Hub-Signature")
-            if sig256:
-                expected = (
-                    "sha256="
-                    + hmac.new(secret_bytes, body_bytes, hashlib.sha256).hexdigest()
-                )
-                if not hmac.compare_digest(sig256, expected):
-                    raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST)
-            elif sig1:
-                expected = (
-                    "sha1="
-                    + hmac.new(secret_bytes, body_bytes, hashlib.sha1).hexdigest()
-                )
-                if not hmac.compare_digest(sig1, expected):
-                    raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST)
-            else:
-                # missing signature header
-                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST)
+        # signature verification: hash the body as it arrives rather than
+        # after it has been read in full
+        signature_check = self._start_signature_check(request.headers)
+        chunks = []
+        async for chunk in request.stream():
+            if signature_check is not None:
+                signature_check[0].update(chunk)
+            chunks.append(chunk)
+        body_bytes = b"".join(chunks)
+        if signature_check is not None:
+            self._finish_signature_check(signature_check)
         # proceed to extract payload
-        functions_to_call = []
         calls = {}
 
         # validate headers and payload
-        payload = await self._extract_payload(request)
-        self.payload = payload
-        self.delivery_id = request.headers.get("X-GitHub-Delivery")
+        payload = self._extract_payload(body_bytes)
         event = request.headers.get("X-GitHub-Event")
-        self.event = event
         action = payload.get("action")
         if not event:
             raise HTTPException(
@@ -819,38 +1305,36 @@ class GitHubApp:
                 },
             )
 
-        # webhook verification can be added here if secret provided
+        webhook_event = WebhookEvent.from_payload(
+            event, payload, request.headers.get("X-GitHub-Delivery")
+        )
 
         # determine functions to call
-        if event in self._hook_mappings:
-            functions_to_call += self._hook_mappings[event]
-
-        if action:
-            event_action = f"{event}.{action}"
-            if event_action in self._hook_mappings:
-                functions_to_call += self._hook_mappings[event_action]
-
-        if functions_to_call:
-            import asyncio
+        functions_to_call = self._resolve_handlers(event, action)
+        if not functions_to_call:
+            return JSONResponse(
+                status_code=status.HTTP_200_OK, content={"status": "MISS", "calls": {}}
+            )
 
-            for function in functions_to_call:
+        token = self._webhook_event.set(webhook_event)
+        try:
+            for function, is_coroutine in functions_to_call:
                 try:
-                    if inspect.iscoroutinefunction(function):
+                    if is_coroutine:
                         result = await function()
                     else:
-                        loop = asyncio.get_running_loop()
-                        result = await loop.run_in_executor(None, function)
+                        # to_thread carries the delivery's context to the worker
+                        result = await asyncio.to_thread(function)
                 except Exception as e:
                     raise HTTPException(
                         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e)
                     )
                 calls[function.__name__] = result
-            return JSONResponse(
-                status_code=status.HTTP_200_OK,
-                content={"status": "HIT", "calls": calls},
-            )
+        finally:
+            self._webhook_event.reset(token)
         return JSONResponse(
-            status_code=status.HTTP_200_OK, content={"status": "MISS", "calls": {}}
+            status_code=status.HTTP_200_OK,
+            content={"status": "HIT", "calls": calls},
         )
 
     def _is_rate_limited(self, response) -> bool:
@@ -7,16 +7,23 @@ configured and enabled.
 
 from typing import Dict, List, Optional, Any
 from urllib.parse import urlencode
+import asyncio
 import secrets
 import time
 import httpx
 
+# Keep-alive settings for the shared OAuth2 client; logins are infrequent, so
+# idle connections are held longer than for the installation API pool
+OAUTH_HTTP_LIMITS = httpx.Limits(max_keepalive_connections=20, keepalive_expiry=120)
+USER_AGENT = "FastAPI-GithubApp/OAuth2"
+
 
 class GitHubOAuth2:
     """GitHub OAuth2 authentication manager.
 
-    Uses a shared httpx.AsyncClient with explicit timeouts. Network calls are
-    performed only when async methods are awaited.
+    Uses a shared HTTP/2 httpx.AsyncClient with explicit timeouts and
+    keep-alive, so repeated logins reuse one connection to GitHub. Network
+    calls are performed only when async methods are awaited.
     """
 
     def __init__(
@@ -43,7 +50,12 @@ class GitHubOAuth2:
 
     def _get_client(self) -> httpx.AsyncClient:
         if self._client is None:
-            self._client = httpx.AsyncClient(timeout=self._timeout)
+            self._client = httpx.AsyncClient(
+                http2=True,
+                limits=OAUTH_HTTP_LIMITS,
+                timeout=self._timeout,
+                headers={"User-Agent": USER_AGENT},
+            )
         return self._client
 
     async def aclose(self) -> None:
@@ -122,15 +134,23 @@ class GitHubOAuth2:
         headers = {
             "Authorization": f"Bearer {access_token}",
             "Accept": "application/vnd.github+json",
-            "User-Agent": "FastAPI-GithubApp/OAuth2",
         }
-        user_resp = await client.get(f"{self.api_url}/user", headers=headers)
-        if user_resp.status_code != 200:
-            raise RuntimeError("Failed to fetch user info")
+        # Both requests share the pooled connection, so send them together;
+        # the emails request is cancelled if the user request fails
+        emails_task = asyncio.ensure_future(
+            client.get(f"{self.api_url}/user/emails", headers=headers)
+        )
+        try:
+            user_resp = await client.get(f"{self.api_url}/user", headers=headers)
+            if user_resp.status_code != 200:
+                raise RuntimeError("Failed to fetch user info")
+        except BaseException:
+            emails_task.cancel()
+            raise
         user = user_resp.json()
+        emails_resp = await emails_task
 
         emails: List[Dict[str, Any]] = []
-        emails_resp = await client.get(f"{self.api_url}/user/emails", headers=headers)
         if emails_resp.status_code == 200:
             emails = emails_resp.json()
 
@@ -0,0 +1,150 @@
+from contextlib import contextmanager
+from types import SimpleNamespace
+from urllib.parse import urlparse, parse_qs
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from githubapp import GitHubApp
+
+
+@pytest.fixture
+def frozen_time(monkeypatch):
+    """Pin ``time.time`` to a fixed, mutable instant: ``frozen_time[0]``."""
+    now = [1_700_000_000.0]
+    monkeypatch.setattr("githubapp.core.time.time", lambda: now[0])
+    return now
+
+
+@pytest.fixture(scope="module")
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture(scope="module")
+async def webhook_app():
+    """A FastAPI app with an unsigned GitHubApp and an in-process ASGI client.
+
+    Built once per module, so the app construction and lifespan startup are
+    not repeated for every webhook test. Requests go straight to the ASGI app
+    rather than through TestClient's portal thread.
+
+    The canonical handlers are registered here once: ``handle_any_issue`` on
+    ``issues``, ``handle_opened_issue`` on ``issues.opened`` and an always
+    raising ``failing_handler`` on ``issues.closed``.
+    """
+    app = FastAPI()
+    github_app = GitHubApp(
+        app,
+        github_app_id=123,
+        github_app_key=b"test_key",
+        github_app_secret=False,
+    )
+
+    @github_app.on("issues")
+    def handle_any_issue():
+        return "handled_any"
+
+    @github_app.on("issues.opened")
+    def handle_opened_issue():
+        return "handled_opened"
+
+    @github_app.on("issues.closed")
+    def failing_handler():
+        raise ValueError("Something went wrong")
+
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://test"
+        ) as client:
+            yield app, github_app, client
+
+
+@pytest.fixture
+def webhook(webhook_app, monkeypatch):
+    """The shared webhook app; hooks registered by the test are dropped after it.
+
+    Use ``monkeypatch.setitem(github_app.config, ...)`` for per-test config so
+    it is restored afterwards.
+    """
+    app, github_app, client = webhook_app
+    hooks = {event: list(fns) for event, fns in github_app._hook_mappings.items()}
+    monkeypatch.setattr(github_app, "_hook_mappings", hooks)
+    monkeypatch.setattr(github_app, "_dispatch_cache", {})
+    return app, github_app, client
+
+
+@pytest.fixture
+def with_hooks(webhook):
+    """Context manager that swaps in other hook mappings for the shared app.
+
+    ``with with_hooks({"issues.opened": [handler]}):`` replaces the canonical
+    handlers and restores them on exit.
+    """
+    _, github_app, _ = webhook
+
+    @contextmanager
+    def swap(hooks):
+        saved = github_app._hook_mappings, github_app._dispatch_cache
+        github_app._hook_mappings = {event: list(fns) for event, fns in hooks.items()}
+        github_app._dispatch_cache = {}
+        try:
+            yield github_app
+        finally:
+            github_app._hook_mappings, github_app._dispatch_cache = saved
+
+    return swap
+
+
+@pytest.fixture
+def valid_state(app_with_oauth):
+    """A fresh OAuth ``state`` issued by ``/auth/github/login``.
+
+    Relies on the ``app_with_oauth`` fixture of the requesting module.
+    """
+    _, _, client = app_with_oauth
+    login = client.get("/auth/github/login")
+    return parse_qs(urlparse(login.json()["auth_url"]).query)["state"][0]
+
+
+@pytest.fixture(scope="session")
+def github_responses():
+    """Successful GitHub OAuth responses, built once per session."""
+    return {
+        "token_ok": httpx.Response(
+            200,
+            json={
+                "access_token": "token123",
+                "token_type": "bearer",
+                "scope": "user:email read:user",
+            },
+        ),
+        "user_ok": httpx.Response(
+            200,
+            json={
+                "id": 42,
+                "login": "octocat",
+                "name": "The Octocat",
+                "email": "octo@example.com",
+                "avatar_url": "https://avatars.githubusercontent.com/u/42",
+            },
+        ),
+        "emails_ok": httpx.Response(
+            200, json=[{"email": "octo@example.com", "primary": True}]
+        ),
+    }
+
+
+@pytest.fixture
+def gh_routes(respx_mock):
+    """respx routes for the GitHub endpoints the OAuth flow calls.
+
+    Tests set responses with ``gh_routes.token.mock(return_value=...)``.
+    """
+    return SimpleNamespace(
+        token=respx_mock.post("https://github.com/login/oauth/access_token"),
+        user=respx_mock.get("https://api.github.com/user"),
+        emails=respx_mock.get("https://api.github.com/user/emails"),
+    )
@@ -1,49 +1,42 @@
+import asyncio
+import orjson
 import pytest
-import time
-from unittest.mock import patch, Mock
+import httpx
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch, Mock
 from fastapi import FastAPI
-from fastapi.testclient import TestClient
-from githubapp import GitHubApp
+from fastapi.routing import APIRoute
+from githubapp import GitHubApp, with_rate_limit_handling
 from githubapp.core import (
+    AsyncGhApi,
+    GitHubRateLimitError,
     GitHubAppError,
     GitHubAppValidationError,
     GitHubAppBadCredentials,
     GithubUnauthorized,
     GithubAppUnkownObject,
     InstallationAuthorization,
-    STATUS_FUNC_CALLED,
-    STATUS_NO_FUNC_CALLED,
 )
 
 
 class TestGitHubAppExceptions:
-    def test_github_app_error(self):
-        error = GitHubAppError("test message", status=400, data={"error": "test"})
-        assert error.message == "test message"
-        assert error.status == 400
-        assert error.data == {"error": "test"}
-        assert str(error) == "test message"
-
-    def test_github_app_validation_error(self):
-        error = GitHubAppValidationError("validation failed", status=422)
-        assert error.message == "validation failed"
-        assert error.status == 422
-        assert error.data is None
-
-    def test_github_app_bad_credentials(self):
-        error = GitHubAppBadCredentials("bad creds", status=403)
-        assert error.message == "bad creds"
-        assert error.status == 403
-
-    def test_github_unauthorized(self):
-        error = GithubUnauthorized("unauthorized", status=401)
-        assert error.message == "unauthorized"
-        assert error.status == 401
-
-    def test_github_app_unknown_object(self):
-        error = GithubAppUnkownObject("not found", status=404)
-        assert error.message == "not found"
-        assert error.status == 404
+    @pytest.mark.parametrize(
+        "cls, message, status, data",
+        [
+            (GitHubAppError, "test message", 400, {"error": "test"}),
+            (GitHubAppValidationError, "validation failed", 422, None),
+            (GitHubAppBadCredentials, "bad creds", 403, None),
+            (GithubUnauthorized, "unauthorized", 401, None),
+            (GithubAppUnkownObject, "not found", 404, None),
+        ],
+    )
+    def test_exception_attributes(self, cls, message, status, data):
+        error = cls(message, status=status, data=data)
+        assert error.message == message
+        assert error.status == status
+        assert error.data == data
+        assert str(error) == message
 
 
 class TestInstallationAuthorization:
@@ -56,16 +49,23 @@ class TestInstallationAuthorization:
         auth = InstallationAuthorization("test_token", None)
         assert auth.expired() is False
 
-    def test_expired_with_future_expiration(self):
-        future_time = time.time() + 3600  # 1 hour from now
-        auth = InstallationAuthorization("test_token", future_time)
+    def test_expired_with_future_expiration(self, frozen_time):
+        auth = InstallationAuthorization("test_token", frozen_time[0] + 3600)
         assert auth.expired() is False
 
-    def test_expired_with_past_expiration(self):
-        past_time = time.time() - 3600  # 1 hour ago
-        auth = InstallationAuthorization("test_token", past_time)
+    def test_expired_with_past_expiration(self, frozen_time):
+        auth = InstallationAuthorization("test_token", frozen_time[0] - 3600)
         assert auth.expired() is True
 
+    def test_expired_with_iso_expiration(self):
+        assert InstallationAuthorization("t", "2023-01-01T00:00:00Z").expired() is True
+        assert InstallationAuthorization("t", "2999-01-01T00:00:00Z").expired() is False
+
+    def test_expired_within_margin(self, frozen_time):
+        auth = InstallationAuthorization("test_token", frozen_time[0] + 30)
+        assert auth.expired() is False
+        assert auth.expired(margin=60) is True
+
 
 class TestGitHubAppInitialization:
     def test_init_without_app(self):
@@ -103,8 +103,8 @@ class TestGitHubAppInitialization:
 class TestGitHubAppLoadEnv:
     @patch.dict("os.environ", {"GITHUBAPP_PRIVATE_KEY": "test_key_content"})
     def test_load_env_with_private_key_env(self):
-        app = FastAPI()
-        app.config = {}
+        # load_env only touches app.config, so no ASGI app is needed
+        app = SimpleNamespace(config={})
         GitHubApp.load_env(app)
         assert app.config["GITHUBAPP_PRIVATE_KEY"] == "test_key_content"
 
@@ -117,6 +117,22 @@ class TestGitHubAppInitApp:
         assert hasattr(app, "config")
         assert isinstance(app.config, dict)
 
+    def test_init_app_registers_plain_webhook_route(self):
+        app = FastAPI()
+        GitHubApp(app)
+
+        route = next(r for r in app.routes if r.path == "/webhooks/github/")
+        assert not isinstance(route, APIRoute)
+        assert route.methods == {"POST"}
+        assert "/webhooks/github/" not in app.openapi()["paths"]
+
+    def test_init_app_after_constructor_does_not_duplicate_route(self):
+        app = FastAPI()
+        github_app = GitHubApp(app, github_app_route="/hooks/")
+        github_app.init_app(app, route="/hooks/")
+
+        assert [r.path for r in app.routes].count("/hooks/") == 1
+
     def test_init_app_sets_config_from_constructor(self):
         app = FastAPI()
         github_app = GitHubApp(
@@ -172,153 +188,206 @@ class TestGitHubAppHookRegistration:
         assert "pull_request.closed" in github_app._hook_mappings
         assert len(github_app._hook_mappings) == 2
 
+    def test_resolve_handlers_event_then_action(self):
+        github_app = GitHubApp()
+
+        @github_app.on("issues.opened")
+        async def on_opened():
+            pass
+
+        @github_app.on("issues")
+        def on_any_issue():
+            pass
+
+        assert github_app._resolve_handlers("issues", "opened") == (
+            (on_any_issue, False),
+            (on_opened, True),
+        )
+        assert github_app._resolve_handlers("issues", "closed") == (
+            (on_any_issue, False),
+        )
+        assert github_app._resolve_handlers("push") == ()
+
+    def test_resolve_handlers_invalidated_by_on(self):
+        github_app = GitHubApp()
+
+        @github_app.on("issues.opened")
+        def first():
+            pass
+
+        assert github_app._resolve_handlers("issues", "opened") == ((first, False),)
+
+        @github_app.on("issues.opened")
+        def second():
+            pass
+
+        assert github_app._resolve_handlers("issues", "opened") == (
+            (first, False),
+            (second, False),
+        )
+
+
+@pytest.fixture
+def gh():
+    return GitHubApp(github_app_id=123, github_app_key=b"test_key")
+
+
+@pytest.fixture
+def mock_jwt_lib(monkeypatch):
+    mock = Mock()
+    monkeypatch.setattr("githubapp.core.jwt", mock)
+    return mock
+
 
 class TestGitHubAppJWT:
-    @patch("githubapp.core.jwt")
-    def test_create_jwt_returns_string(self, mock_jwt):
-        mock_jwt.encode.return_value = "jwt_token_string"
+    def test_create_jwt_returns_string(self, gh, mock_jwt_lib):
+        mock_jwt_lib.encode.return_value = "jwt_token_string"
 
-        github_app = GitHubApp(github_app_id=123, github_app_key=b"test_key")
-        result = github_app._create_jwt()
+        result = gh._create_jwt()
 
         assert result == "jwt_token_string"
-        mock_jwt.encode.assert_called_once()
+        mock_jwt_lib.encode.assert_called_once()
 
-    @patch("githubapp.core.jwt")
-    def test_create_jwt_converts_bytes_to_string(self, mock_jwt):
-        mock_jwt.encode.return_value = b"jwt_token_bytes"
+    def test_create_jwt_converts_bytes_to_string(self, gh, mock_jwt_lib):
+        mock_jwt_lib.encode.return_value = b"jwt_token_bytes"
 
-        github_app = GitHubApp(github_app_id=123, github_app_key=b"test_key")
-        result = github_app._create_jwt()
+        result = gh._create_jwt()
 
         assert result == "jwt_token_bytes"
 
-    @patch("githubapp.core.jwt")
-    @patch("githubapp.core.time")
-    def test_create_jwt_payload_structure(self, mock_time, mock_jwt):
-        mock_time.time.return_value = 1640995200  # Fixed timestamp
-        mock_jwt.encode.return_value = "jwt_token"
+    def test_create_jwt_payload_structure(self, gh, mock_jwt_lib, frozen_time):
+        mock_jwt_lib.encode.return_value = "jwt_token"
 
-        github_app = GitHubApp(github_app_id=123, github_app_key=b"test_key")
-        github_app._create_jwt(expiration=300)
+        gh._create_jwt(expiration=300)
 
-        expected_payload = {"iat": 1640995200, "exp": 1640995200 + 300, "iss": "123"}
-        mock_jwt.encode.assert_called_once_with(
+        now = int(frozen_time[0])
+        expected_payload = {"iat": now, "exp": now + 300, "iss": "123"}
+        mock_jwt_lib.encode.assert_called_once_with(
             expected_payload, key=b"test_key", algorithm="RS256"
         )
 
 
+@pytest.fixture
+def github_api(respx_mock):
+    """Mock the GitHub App token and installation endpoints.
+
+    Tests swap a route's response with ``github_api.routes[name].mock(...)``.
+    """
+    respx_mock.post(
+        "https://api.github.com/app/installations/456/access_tokens", name="token"
+    ).mock(
+        return_value=httpx.Response(
+            201, json={"token": "test_token", "expires_at": "2023-01-01T00:00:00Z"}
+        )
+    )
+    respx_mock.get(
+        "https://api.github.com/app/installations", name="installations"
+    ).mock(return_value=httpx.Response(200, json=[]))
+    return respx_mock
+
+
 class TestGitHubAppAccessToken:
-    @patch("githubapp.core.httpx.post")
     @patch.object(GitHubApp, "_create_jwt", return_value="test_jwt")
-    def test_get_access_token_success(self, mock_jwt, mock_post):
-        mock_response = Mock()
-        mock_response.status_code = 201
-        mock_response.json.return_value = {
-            "token": "test_token",
-            "expires_at": "2023-01-01T00:00:00Z",
-        }
-        mock_post.return_value = mock_response
-
-        github_app = GitHubApp(github_app_id=123, github_app_key=b"test_key")
-        result = github_app.get_access_token(installation_id=456)
+    def test_get_access_token_success(self, mock_jwt, gh, github_api):
+        result = gh.get_access_token(installation_id=456)
 
         assert isinstance(result, InstallationAuthorization)
         assert result.token == "test_token"
         assert result.expires_at == "2023-01-01T00:00:00Z"
 
-    @patch("githubapp.core.httpx.post")
-    @patch.object(GitHubApp, "_create_jwt", return_value="test_jwt")
-    def test_get_access_token_with_user_id(self, mock_jwt, mock_post):
-        mock_response = Mock()
-        mock_response.status_code = 201
-        mock_response.json.return_value = {
-            "token": "test_token",
-            "expires_at": "2023-01-01T00:00:00Z",
-        }
-        mock_post.return_value = mock_response
-
-        github_app = GitHubApp(github_app_id=123, github_app_key=b"test_key")
-        github_app.get_access_token(installation_id=456, user_id=789)
-
-        mock_post.assert_called_once()
-        call_args = mock_post.call_args
-        assert call_args[1]["json"] == {"user_id": 789}
-
-    @patch("githubapp.core.httpx.post")
     @patch.object(GitHubApp, "_create_jwt", return_value="test_jwt")
-    def test_get_access_token_forbidden(self, mock_jwt, mock_post):
-        mock_response = Mock()
-        mock_response.status_code = 403
-        mock_response.text = "Forbidden"
-        mock_post.return_value = mock_response
+    def test_get_access_token_with_user_id(self, mock_jwt, gh, github_api):
+        gh.get_access_token(installation_id=456, user_id=789)
 
-        github_app = GitHubApp(github_app_id=123, github_app_key=b"test_key")
+        token_route = github_api.routes["token"]
+        assert token_route.call_count == 1
+        assert orjson.loads(token_route.calls.last.request.content) == {"user_id": 789}
 
-        with pytest.raises(GitHubAppBadCredentials) as exc_info:
-            github_app.get_access_token(installation_id=456)
+    @patch.object(GitHubApp, "_create_jwt", return_value="test_jwt")
+    def test_get_access_token_cached_until_expiry(self, mock_jwt, gh, github_api):
+        github_api.routes["token"].mock(
+            return_value=httpx.Response(
+                201, json={"token": "test_token", "expires_at": "2999-01-01T00:00:00Z"}
+            )
+        )
+
+        first = gh.get_access_token(installation_id=456)
+        second = gh.get_access_token(installation_id=456)
 
-        assert exc_info.value.status == 403
+        assert first is second
+        assert github_api.routes["token"].call_count == 1
+        mock_jwt.assert_called_once()
 
-    @patch("githubapp.core.httpx.post")
     @patch.object(GitHubApp, "_create_jwt", return_value="test_jwt")
-    def test_get_access_token_not_found(self, mock_jwt, mock_post):
-        mock_response = Mock()
-        mock_response.status_code = 404
-        mock_response.text = "Not Found"
-        mock_post.return_value = mock_response
+    def test_get_access_token_with_user_id_not_cached(self, mock_jwt, gh, github_api):
+        github_api.routes["token"].mock(
+            return_value=httpx.Response(
+                201, json={"token": "test_token", "expires_at": "2999-01-01T00:00:00Z"}
+            )
+        )
 
-        github_app = GitHubApp(github_app_id=123, github_app_key=b"test_key")
+        gh.get_access_token(installation_id=456, user_id=789)
+        gh.get_access_token(installation_id=456, user_id=789)
 
-        with pytest.raises(GithubAppUnkownObject) as exc_info:
-            github_app.get_access_token(installation_id=456)
+        assert github_api.routes["token"].call_count == 2
+        # The app JWT is still reused between the two requests
+        mock_jwt.assert_called_once()
 
-        assert exc_info.value.status == 404
+    def test_installation_token_cache_is_bounded(self, gh, monkeypatch):
+        monkeypatch.setattr("githubapp.core.INSTALLATION_TOKEN_CACHE_SIZE", 2)
+        gh._installation_token_locks.update({1: Mock(), 2: Mock(), 3: Mock()})
+
+        for installation_id in (1, 2, 3):
+            gh._store_access_token(
+                installation_id, None, InstallationAuthorization("token", None)
+            )
+
+        assert list(gh._installation_tokens) == [2, 3]
+        assert list(gh._installation_token_locks) == [2, 3]
 
 
 class TestGitHubAppListInstallations:
-    @patch("githubapp.core.httpx.get")
     @patch.object(GitHubApp, "_create_jwt", return_value="test_jwt")
-    def test_list_installations_success(self, mock_jwt, mock_get):
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = [{"id": 1}, {"id": 2}]
-        mock_get.return_value = mock_response
+    def test_list_installations_success(self, mock_jwt, gh, github_api):
+        github_api.routes["installations"].mock(
+            return_value=httpx.Response(200, json=[{"id": 1}, {"id": 2}])
+        )
 
-        github_app = GitHubApp(github_app_id=123, github_app_key=b"test_key")
-        result = github_app.list_installations()
+        result = gh.list_installations()
 
         assert result == [{"id": 1}, {"id": 2}]
-        mock_get.assert_called_once()
+        assert github_api.routes["installations"].call_count == 1
 
-    @patch("githubapp.core.httpx.get")
     @patch.object(GitHubApp, "_create_jwt", return_value="test_jwt")
-    def test_list_installations_with_pagination(self, mock_jwt, mock_get):
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = []
-        mock_get.return_value = mock_response
-
-        github_app = GitHubApp(github_app_id=123, github_app_key=b"test_key")
-        github_app.list_installations(per_page=50, page=2)
-
-        call_args = mock_get.call_args
-        assert call_args[1]["params"] == {"page": 2, "per_page": 50}
-
-    @patch("githubapp.core.httpx.get")
+    def test_list_installations_with_pagination(self, mock_jwt, gh, github_api):
+        gh.list_installations(per_page=50, page=2)
+
+        request = github_api.routes["installations"].calls.last.request
+        assert dict(request.url.params) == {"page": "2", "per_page": "50"}
+
+
+class TestGitHubAppErrorResponses:
+    @pytest.mark.parametrize(
+        "method, args, status, exc",
+        [
+            ("get_access_token", (456,), 403, GitHubAppBadCredentials),
+            ("get_access_token", (456,), 404, GithubAppUnkownObject),
+            ("list_installations", (), 401, GithubUnauthorized),
+            ("list_installations", (), 403, GitHubAppBadCredentials),
+            ("list_installations", (), 404, GithubAppUnkownObject),
+        ],
+    )
     @patch.object(GitHubApp, "_create_jwt", return_value="test_jwt")
-    def test_list_installations_unauthorized(self, mock_jwt, mock_get):
-        mock_response = Mock()
-        mock_response.status_code = 401
-        mock_response.text = "Unauthorized"
-        mock_get.return_value = mock_response
-
-        github_app = GitHubApp(github_app_id=123, github_app_key=b"test_key")
+    def test_error_status_raises(
+        self, mock_jwt, gh, github_api, method, args, status, exc
+    ):
+        route = "token" if method == "get_access_token" else "installations"
+        github_api.routes[route].mock(return_value=httpx.Response(status, text="error"))
 
-        with pytest.raises(GithubUnauthorized) as exc_info:
-            github_app.list_installations()
+        with pytest.raises(exc) as exc_info:
+            getattr(gh, method)(*args)
 
-        assert exc_info.value.status == 401
+        assert exc_info.value.status == status
 
 
 class TestGitHubAppClient:
@@ -351,194 +420,192 @@ class TestGitHubAppClient:
 
         github_app = GitHubApp()
         github_app.payload = {"installation": {"id": 456}}
-        github_app.client()
+        try:
+            github_app.client()
+        finally:
+            github_app.payload = None
 
         mock_get_token.assert_called_once_with(456)
 
+    def test_payload_is_per_instance(self):
+        first = GitHubApp()
+        second = GitHubApp()
 
-class TestGitHubAppWebhookHandling:
-    def test_handle_request_missing_content_type(self):
-        app = FastAPI()
-        GitHubApp(app)
+        first.payload = {"installation": {"id": 456}}
+        try:
+            assert second.payload is None
+            assert second.webhook_event is None
+        finally:
+            first.payload = None
 
-        with TestClient(app) as client:
-            response = client.post("/webhooks/github/", json={"test": "data"})
-            assert response.status_code == 400
 
-    def test_handle_request_missing_github_event_header(self):
-        app = FastAPI()
-        GitHubApp(app)
+@pytest.fixture
+async def async_gh(gh):
+    """The ``gh`` app, with its pooled HTTP client closed after the test."""
+    yield gh
+    await gh.aclose()
 
-        with TestClient(app) as client:
-            response = client.post(
-                "/webhooks/github/",
-                json={"installation": {"id": 123}},
-                headers={"Content-Type": "application/json"},
-            )
-            assert response.status_code == 400
 
-    def test_handle_request_valid_webhook(self):
-        app = FastAPI()
-        github_app = GitHubApp(
-            app,
-            github_app_id=123,
-            github_app_key=b"test_key",
-            github_app_secret=False,
+@pytest.mark.anyio
+class TestGitHubAppAsyncClient:
+    @patch.object(GitHubApp, "_create_jwt", return_value="test_jwt")
+    async def test_async_client_endpoint_call(self, mock_jwt, async_gh, github_api):
+        comment_route = github_api.post(
+            "https://api.github.com/repos/octo/repo/issues/1/comments"
+        ).mock(return_value=httpx.Response(201, json={"id": 456}))
+
+        client = await async_gh.async_client(installation_id=456)
+        assert isinstance(client, AsyncGhApi)
+        result = await client.issues.create_comment(
+            owner="octo", repo="repo", issue_number=1, body="hello"
         )
 
-        @github_app.on("issues.opened")
-        def test_handler():
-            return "handled"
-
-        with TestClient(app) as client:
-            response = client.post(
-                "/webhooks/github/",
-                json={
-                    "action": "opened",
-                    "installation": {"id": 123},
-                    "issue": {"number": 1},
-                },
-                headers={
-                    "Content-Type": "application/json",
-                    "X-GitHub-Event": "issues",
-                },
-            )
-            assert response.status_code == 200
-            data = response.json()
-            assert data["status"] == STATUS_FUNC_CALLED
-            assert "test_handler" in data["calls"]
+        assert result.id == 456
+        request = comment_route.calls.last.request
+        assert request.headers["Authorization"] == "token test_token"
+        assert orjson.loads(request.content) == {"body": "hello"}
 
-    def test_handle_request_call_async_hook_function(self):
-        app = FastAPI()
-        github_app = GitHubApp(
-            app,
-            github_app_id=123,
-            github_app_key=b"test_key",
-            github_app_secret=False,
+    @patch.object(GitHubApp, "_create_jwt", return_value="test_jwt")
+    async def test_async_client_reused_per_installation(
+        self, mock_jwt, async_gh, github_api
+    ):
+        github_api.routes["token"].mock(
+            side_effect=[
+                httpx.Response(
+                    201, json={"token": "token1", "expires_at": "2023-01-01T00:00:00Z"}
+                ),
+                httpx.Response(
+                    201, json={"token": "token2", "expires_at": "2023-01-01T00:00:00Z"}
+                ),
+            ]
         )
 
-        @github_app.on("issues.opened")
-        async def async_test_handler():
-            return "handled"
-
-        with TestClient(app) as client:
-            response = client.post(
-                "/webhooks/github/",
-                json={
-                    "action": "opened",
-                    "installation": {"id": 123},
-                    "issue": {"number": 1},
-                },
-                headers={
-                    "Content-Type": "application/json",
-                    "X-GitHub-Event": "issues",
-                },
-            )
-            assert response.status_code == 200
-            data = response.json()
-            assert data["status"] == STATUS_FUNC_CALLED
-            assert "async_test_handler" in data["calls"]
+        first = await async_gh.async_client(installation_id=456)
+        second = await async_gh.async_client(installation_id=456)
+        await async_gh.aclose()
 
+        assert first is second
+        assert second.headers["Authorization"] == "token token2"
+        assert async_gh._async_clients == {}
 
-class TestGitHubAppIntegration:
-    def test_full_webhook_flow(self):
-        """Test complete webhook handling flow"""
-        app = FastAPI()
-        github_app = GitHubApp(
-            app,
-            github_app_id=123,
-            github_app_key=b"test_key",
-            github_app_secret=False,
+    @patch.object(GitHubApp, "_create_jwt", return_value="test_jwt")
+    async def test_rate_limited_retries_in_transport(
+        self, mock_jwt, async_gh, github_api, mocker
+    ):
+        comment_route = github_api.post(
+            "https://api.github.com/repos/octo/repo/issues/1/comments"
+        ).mock(
+            side_effect=[
+                httpx.Response(
+                    403, headers={"x-ratelimit-remaining": "0", "retry-after": "1"}
+                ),
+                httpx.Response(201, json={"id": 456}),
+            ]
         )
+        mock_sleep = mocker.patch("githubapp.core.asyncio.sleep", new=AsyncMock())
 
-        results = []
+        @with_rate_limit_handling(async_gh)
+        async def handler():
+            client = await async_gh.async_client(installation_id=456)
+            return await client.issues.create_comment(
+                owner="octo", repo="repo", issue_number=1, body="hello"
+            )
 
-        @github_app.on("issues")
-        def handle_any_issue():
-            results.append("any_issue")
-            return "handled_any"
+        result = await handler()
 
-        @github_app.on("issues.opened")
-        def handle_opened_issue():
-            results.append("opened_issue")
-            return "handled_opened"
-
-        with TestClient(app) as client:
-            response = client.post(
-                "/webhooks/github/",
-                json={
-                    "action": "opened",
-                    "installation": {"id": 123},
-                    "issue": {"number": 1},
-                },
-                headers={
-                    "Content-Type": "application/json",
-                    "X-GitHub-Event": "issues",
-                },
+        assert result.id == 456
+        assert comment_route.call_count == 2
+        mock_sleep.assert_awaited_once_with(1)
+
+    @patch.object(GitHubApp, "_create_jwt", return_value="test_jwt")
+    async def test_rate_limited_raises_when_retries_exhausted(
+        self, mock_jwt, async_gh, github_api, mocker
+    ):
+        comment_route = github_api.post(
+            "https://api.github.com/repos/octo/repo/issues/1/comments"
+        ).mock(return_value=httpx.Response(429, headers={"retry-after": "1"}))
+        mocker.patch("githubapp.core.asyncio.sleep", new=AsyncMock())
+
+        # the app retries twice by default
+        client = await async_gh.async_client(installation_id=456)
+        with pytest.raises(GitHubRateLimitError) as exc_info:
+            async with async_gh.rate_limited():
+                await client.issues.create_comment(
+                    owner="octo", repo="repo", issue_number=1, body="hello"
+                )
+
+        assert exc_info.value.status == 429
+        assert comment_route.call_count == 3
+
+    @patch.object(GitHubApp, "_create_jwt", return_value="test_jwt")
+    async def test_rate_limit_not_retried_outside_context(
+        self, mock_jwt, async_gh, github_api
+    ):
+        comment_route = github_api.post(
+            "https://api.github.com/repos/octo/repo/issues/1/comments"
+        ).mock(return_value=httpx.Response(429, headers={"retry-after": "1"}))
+
+        client = await async_gh.async_client(installation_id=456)
+        with pytest.raises(httpx.HTTPStatusError):
+            await client.issues.create_comment(
+                owner="octo", repo="repo", issue_number=1, body="hello"
             )
 
-            assert response.status_code == 200
-            data = response.json()
-            assert data["status"] == STATUS_FUNC_CALLED
-            assert len(data["calls"]) == 2
-            assert "handle_any_issue" in data["calls"]
-            assert "handle_opened_issue" in data["calls"]
+        assert comment_route.call_count == 1
 
-    def test_no_matching_handlers(self):
-        """Test webhook with no matching handlers"""
+    async def test_lifespan_closes_pooled_http_client(self):
         app = FastAPI()
-        GitHubApp(
-            app,
-            github_app_id=123,
-            github_app_key=b"test_key",
-            github_app_secret=False,
-        )
+        github_app = GitHubApp(app)
 
-        with TestClient(app) as client:
-            response = client.post(
-                "/webhooks/github/",
-                json={
-                    "action": "closed",
-                    "installation": {"id": 123},
-                    "issue": {"number": 1},
-                },
-                headers={
-                    "Content-Type": "application/json",
-                    "X-GitHub-Event": "issues",
-                },
-            )
+        async with app.router.lifespan_context(app):
+            github_app._get_http_client()
+            assert github_app._http_client is not None
 
-            assert response.status_code == 200
-            data = response.json()
-            assert data["status"] == STATUS_NO_FUNC_CALLED
-            assert data["calls"] == {}
+        assert github_app._http_client is None
 
-    def test_handler_exception_returns_500(self):
-        """Test that exceptions in handlers return 500"""
-        app = FastAPI()
-        github_app = GitHubApp(
-            app,
-            github_app_id=123,
-            github_app_key=b"test_key",
-            github_app_secret=False,
+    async def test_lifespan_closes_after_app_shutdown(self):
+        seen = []
+
+        @asynccontextmanager
+        async def lifespan(app):
+            yield
+            seen.append(github_app._http_client is not None)
+
+        app = FastAPI(lifespan=lifespan)
+        github_app = GitHubApp(app)
+
+        async with app.router.lifespan_context(app):
+            github_app._get_http_client()
+
+        assert seen == [True]
+        assert github_app._http_client is None
+
+    @patch.object(GitHubApp, "_create_jwt", return_value="test_jwt")
+    async def test_async_get_access_token_not_found(
+        self, mock_jwt, async_gh, github_api
+    ):
+        github_api.routes["token"].mock(
+            return_value=httpx.Response(404, text="Not Found")
         )
 
-        @github_app.on("issues.opened")
-        def failing_handler():
-            raise ValueError("Something went wrong")
-
-        with TestClient(app) as client:
-            response = client.post(
-                "/webhooks/github/",
-                json={
-                    "action": "opened",
-                    "installation": {"id": 123},
-                    "issue": {"number": 1},
-                },
-                headers={
-                    "Content-Type": "application/json",
-                    "X-GitHub-Event": "issues",
-                },
+        with pytest.raises(GithubAppUnkownObject) as exc_info:
+            await async_gh.async_get_access_token(installation_id=456)
+
+        assert exc_info.value.status == 404
+
+    @patch.object(GitHubApp, "_create_jwt", return_value="test_jwt")
+    async def test_async_get_access_token_concurrent_refresh(
+        self, mock_jwt, async_gh, github_api
+    ):
+        token_route = github_api.routes["token"].mock(
+            return_value=httpx.Response(
+                201, json={"token": "test_token", "expires_at": "2999-01-01T00:00:00Z"}
             )
+        )
+
+        tokens = await asyncio.gather(
+            *[async_gh.async_get_access_token(456) for _ in range(5)]
+        )
 
-            assert response.status_code == 500
+        assert {auth.token for auth in tokens} == {"test_token"}
+        assert token_route.call_count == 1
@@ -1,15 +1,13 @@
 from urllib.parse import urlparse, parse_qs
 
 import pytest
-import respx
-import httpx
 from fastapi import FastAPI
 from fastapi.testclient import TestClient
 
 from githubapp import GitHubApp
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def app_with_oauth():
     app = FastAPI()
     gh = GitHubApp(
@@ -19,14 +17,13 @@ def app_with_oauth():
         oauth_redirect_uri="http://localhost/callback",
         oauth_session_secret="test-session-secret",
     )
-    # Return both for potential future assertions
-    return app, gh
+    with TestClient(app) as client:
+        yield app, gh, client
 
 
 def test_oauth_login_returns_auth_url(app_with_oauth):
-    app, _ = app_with_oauth
-    with TestClient(app) as client:
-        resp = client.get("/auth/github/login")
+    _, _, client = app_with_oauth
+    resp = client.get("/auth/github/login")
     assert resp.status_code == 200
     data = resp.json()
     assert "auth_url" in data
@@ -38,60 +35,35 @@ def test_oauth_login_returns_auth_url(app_with_oauth):
     assert "state" in qs and len(qs["state"][0]) > 0
 
 
-@respx.mock
-def test_oauth_callback_and_user(app_with_oauth):
-    app, gh = app_with_oauth
-    with TestClient(app) as client:
-        # 1) Get state from login
-        login = client.get("/auth/github/login")
-        state = parse_qs(urlparse(login.json()["auth_url"]).query)["state"][0]
+def test_oauth_callback_and_user(
+    app_with_oauth, valid_state, gh_routes, github_responses
+):
+    _, gh, client = app_with_oauth
+    # 1) Mock GitHub endpoints used by OAuth
+    gh_routes.token.mock(return_value=github_responses["token_ok"])
+    gh_routes.user.mock(return_value=github_responses["user_ok"])
+    gh_routes.emails.mock(return_value=github_responses["emails_ok"])
 
-        # 2) Mock GitHub endpoints used by OAuth
-        token_route = respx.post("https://github.com/login/oauth/access_token").mock(
-            return_value=httpx.Response(
-                200,
-                json={
-                    "access_token": "token123",
-                    "token_type": "bearer",
-                    "scope": "user:email read:user",
-                },
-            )
-        )
-        user_route = respx.get("https://api.github.com/user").mock(
-            return_value=httpx.Response(
-                200,
-                json={
-                    "id": 42,
-                    "login": "octocat",
-                    "name": "The Octocat",
-                    "email": "octo@example.com",
-                    "avatar_url": "https://avatars.githubusercontent.com/u/42",
-                },
-            )
-        )
-        emails_route = respx.get("https://api.github.com/user/emails").mock(
-            return_value=httpx.Response(
-                200, json=[{"email": "octo@example.com", "primary": True}]
-            )
-        )
-
-        # 3) Do callback
-        cb = client.get("/auth/github/callback", params={"code": "abc", "state": state})
-        assert cb.status_code == 200
-        body = cb.json()
-        assert body["user"]["login"] == "octocat"
-        assert "session_token" in body
+    # 2) Do callback
+    cb = client.get(
+        "/auth/github/callback", params={"code": "abc", "state": valid_state}
+    )
+    assert cb.status_code == 200
+    body = cb.json()
+    assert body["user"]["login"] == "octocat"
+    assert "session_token" in body
 
-        # Ensure mocks were hit
-        assert token_route.called
-        assert user_route.called
-        assert emails_route.called
+    # Ensure mocks were hit
+    assert gh_routes.token.called
+    assert gh_routes.user.called
+    assert gh_routes.emails.called
+    user_request = gh_routes.user.calls.last.request
+    assert user_request.headers["Authorization"] == "Bearer token123"
+    assert user_request.headers["User-Agent"] == "FastAPI-GithubApp/OAuth2"
 
-        # 4) Use the session token to call /user
-        token = body["session_token"]
-        me = client.get(
-            "/auth/github/user", headers={"Authorization": f"Bearer {token}"}
-        )
-        assert me.status_code == 200
-        claims = me.json()
-        assert claims["login"] == "octocat"
+    # 3) Use the session token to call /user
+    token = body["session_token"]
+    me = client.get("/auth/github/user", headers={"Authorization": f"Bearer {token}"})
+    assert me.status_code == 200
+    claims = me.json()
+    assert claims["login"] == "octocat"
@@ -1,15 +1,15 @@
-from urllib.parse import urlparse, parse_qs
+import asyncio
 
 import pytest
-import respx
 import httpx
 from fastapi import FastAPI
 from fastapi.testclient import TestClient
 
 from githubapp import GitHubApp
+from githubapp.oauth import GitHubOAuth2
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def app_with_oauth():
     app = FastAPI()
     gh = GitHubApp(
@@ -19,74 +19,95 @@ def app_with_oauth():
         oauth_redirect_uri="http://localhost/callback",
         oauth_session_secret="test-session-secret",
     )
-    return app, gh
+    with TestClient(app) as client:
+        yield app, gh, client
 
 
 def test_callback_missing_code_returns_400(app_with_oauth):
-    app, _ = app_with_oauth
-    with TestClient(app) as client:
-        resp = client.get("/auth/github/callback")
-        assert resp.status_code == 400
-        assert "Missing authorization code" in resp.text
+    _, _, client = app_with_oauth
+    resp = client.get("/auth/github/callback")
+    assert resp.status_code == 400
+    assert "Missing authorization code" in resp.text
 
 
 def test_callback_invalid_state_returns_500(app_with_oauth):
-    app, _ = app_with_oauth
-    with TestClient(app) as client:
-        # No prior login; pass a bogus state
-        resp = client.get(
-            "/auth/github/callback", params={"code": "abc", "state": "bogus"}
-        )
-        # Current implementation raises, resulting in 500
-        assert resp.status_code == 500
-
-
-@respx.mock
-def test_callback_token_exchange_http_error_returns_500(app_with_oauth):
-    app, _ = app_with_oauth
-    with TestClient(app) as client:
-        # First get a valid state via /login
-        login = client.get("/auth/github/login")
-        state = parse_qs(urlparse(login.json()["auth_url"]).query)["state"][0]
-
-        # Mock GitHub token endpoint to return 400
-        respx.post("https://github.com/login/oauth/access_token").mock(
-            return_value=httpx.Response(400, json={"error": "bad_verification_code"})
-        )
-
-        resp = client.get(
-            "/auth/github/callback", params={"code": "abc", "state": state}
-        )
-        assert resp.status_code == 500
-
+    _, _, client = app_with_oauth
+    # No prior login; pass a bogus state
+    resp = client.get("/auth/github/callback", params={"code": "abc", "state": "bogus"})
+    # Current implementation raises, resulting in 500
+    assert resp.status_code == 500
+
+
+def test_callback_token_exchange_http_error_returns_500(
+    app_with_oauth, valid_state, gh_routes
+):
+    _, _, client = app_with_oauth
+    # Mock GitHub token endpoint to return 400
+    gh_routes.token.mock(
+        return_value=httpx.Response(400, json={"error": "bad_verification_code"})
+    )
 
-@respx.mock
-def test_callback_token_exchange_json_error_returns_500(app_with_oauth):
-    app, _ = app_with_oauth
-    with TestClient(app) as client:
-        login = client.get("/auth/github/login")
-        state = parse_qs(urlparse(login.json()["auth_url"]).query)["state"][0]
-
-        # Mock GitHub token endpoint to return 200 with error field
-        respx.post("https://github.com/login/oauth/access_token").mock(
-            return_value=httpx.Response(
-                200,
-                json={
-                    "error": "incorrect_client_credentials",
-                    "error_description": "Client authentication failed",
-                },
-            )
+    resp = client.get(
+        "/auth/github/callback", params={"code": "abc", "state": valid_state}
+    )
+    assert resp.status_code == 500
+
+
+def test_callback_token_exchange_json_error_returns_500(
+    app_with_oauth, valid_state, gh_routes
+):
+    _, _, client = app_with_oauth
+    # Mock GitHub token endpoint to return 200 with error field
+    gh_routes.token.mock(
+        return_value=httpx.Response(
+            200,
+            json={
+                "error": "incorrect_client_credentials",
+                "error_description": "Client authentication failed",
+            },
         )
+    )
 
-        resp = client.get(
-            "/auth/github/callback", params={"code": "abc", "state": state}
-        )
-        assert resp.status_code == 500
+    resp = client.get(
+        "/auth/github/callback", params={"code": "abc", "state": valid_state}
+    )
+    assert resp.status_code == 500
 
 
 def test_user_missing_token_returns_401(app_with_oauth):
-    app, _ = app_with_oauth
-    with TestClient(app) as client:
-        resp = client.get("/auth/github/user")
-        assert resp.status_code == 401
-        assert "Missing session token" in resp.text
+    _, _, client = app_with_oauth
+    resp = client.get("/auth/github/user")
+    assert resp.status_code == 401
+    assert "Missing session token" in resp.text
+
+
+@pytest.mark.anyio
+async def test_user_info_failure_cancels_emails_request(gh_routes):
+    oauth = GitHubOAuth2("client-id", "client-secret")
+    emails_started = asyncio.Event()
+    cancelled = []
+
+    async def hang(request):
+        emails_started.set()
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.append(request.url.path)
+            raise
+        return httpx.Response(200, json=[])
+
+    async def fail_once_emails_started(request):
+        await emails_started.wait()
+        return httpx.Response(401)
+
+    gh_routes.user.mock(side_effect=fail_once_emails_started)
+    gh_routes.emails.mock(side_effect=hang)
+
+    try:
+        with pytest.raises(RuntimeError, match="Failed to fetch user info"):
+            await oauth.get_user_info("token")
+        await asyncio.sleep(0)
+    finally:
+        await oauth.aclose()
+
+    assert cancelled == ["/user/emails"]
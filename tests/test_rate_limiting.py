@@ -1,77 +1,119 @@
 import pytest
-from unittest.mock import Mock, patch
-import time
+from dataclasses import dataclass, field
+from types import SimpleNamespace
+from unittest.mock import Mock
 from githubapp import GitHubApp, with_rate_limit_handling
 
 
+@dataclass
+class MockResponse:
+    """A minimal stand-in for an HTTP response, as seen by the rate limit helpers."""
+
+    status_code: int = 200
+    headers: dict = field(default_factory=dict)
+
+
+@pytest.mark.usefixtures("frozen_time")
 class TestRateLimitHandling:
     """Test suite for rate limit handling functionality."""
 
-    def setup_method(self):
-        """Set up test fixtures."""
-        self.app = GitHubApp(
+    @pytest.fixture(scope="class")
+    def app(self):
+        """One GitHubApp shared by the tests in this class."""
+        return GitHubApp(
             github_app_id=12345,
             github_app_key=b"fake-key-for-testing",
             github_app_secret=b"fake-secret",
             rate_limit_retries=2,
             rate_limit_max_sleep=5,
         )
-        self.app.payload = {"installation": {"id": 123}}
 
-    def test_decorator_wraps_client_calls(self):
+    @pytest.fixture(autouse=True)
+    def payload(self, app):
+        """Reset the webhook payload the shared app resolves installations from."""
+        app.payload = {"installation": {"id": 123}}
+        yield app.payload
+        app.payload = None
+
+    @pytest.fixture(autouse=True)
+    def clean_hooks(self, app, monkeypatch):
+        """Drop any hooks a test registers on the shared app."""
+        monkeypatch.setattr(app, "_hook_mappings", {})
+        monkeypatch.setattr(app, "_dispatch_cache", {})
+
+    @pytest.fixture(autouse=True)
+    def sleeps(self, monkeypatch):
+        """Make time.sleep a no-op for every test; records the requested delays."""
+        calls = []
+        monkeypatch.setattr("githubapp.core.time.sleep", calls.append)
+        return calls
+
+    @pytest.fixture
+    def async_sleeps(self, monkeypatch):
+        """Make asyncio.sleep return at once for the async backoff; records the delays."""
+        calls = []
+
+        async def sleep(delay):
+            calls.append(delay)
+
+        monkeypatch.setattr("githubapp.core.asyncio.sleep", sleep)
+        return calls
+
+    @pytest.fixture
+    def gh_mocks(self, mocker, app):
+        """Patch GhApi and the token lookup; returns (ghapi instance, token mock).
+
+        Assign endpoint mocks explicitly (``ghapi.issues.create = Mock(...)``):
+        RateLimitedGhApi wraps the callable ``ghapi.issues`` and only attributes
+        set on it directly are carried over to the wrapper.
+        """
+        ghapi = mocker.patch("githubapp.core.GhApi").return_value
+        token = mocker.patch.object(app, "get_access_token")
+        token.return_value.token = "fake-token"
+        return ghapi, token
+
+    def test_decorator_wraps_client_calls(self, app, gh_mocks):
         """Test that the decorator properly wraps GhApi client calls."""
-        mock_ghapi = Mock()
-        mock_ghapi.issues = Mock()
-        mock_ghapi.issues.create_comment = Mock(return_value={"id": 456})
-
-        with patch("githubapp.core.GhApi", return_value=mock_ghapi):
-            with patch.object(self.app, "get_access_token") as mock_token:
-                mock_token.return_value.token = "fake-token"
+        ghapi, _ = gh_mocks
+        ghapi.issues.create_comment = Mock(return_value={"id": 456})
 
-                @self.app.on("issues.opened")
-                @with_rate_limit_handling(self.app)
-                def handle_issue():
-                    client = self.app.get_client()
-                    return client.issues.create_comment(owner="test", repo="test")
+        @with_rate_limit_handling(app)
+        def handle_issue():
+            client = app.get_client()
+            return client.issues.create_comment(owner="test", repo="test")
 
-                result = handle_issue()
-                assert result["id"] == 456
-                assert mock_ghapi.issues.create_comment.call_count == 1
+        result = handle_issue()
+        assert result["id"] == 456
+        assert ghapi.issues.create_comment.call_count == 1
 
-    def test_decorator_preserves_function_behavior(self):
+    def test_decorator_preserves_function_behavior(self, app, gh_mocks):
         """Test that decorated functions still work normally without rate limits."""
-        mock_ghapi = Mock()
-        mock_ghapi.pulls = Mock()
-        mock_ghapi.pulls.create = Mock(return_value={"number": 123})
-
-        with patch("githubapp.core.GhApi", return_value=mock_ghapi):
-            with patch.object(self.app, "get_access_token") as mock_token:
-                mock_token.return_value.token = "fake-token"
-
-                @self.app.on("pull_request.opened")
-                @with_rate_limit_handling(self.app)
-                def handle_pr():
-                    client = self.app.get_client()
-                    return client.pulls.create(owner="test", repo="test", title="Test")
-
-                result = handle_pr()
-                assert result["number"] == 123
-                mock_ghapi.pulls.create.assert_called_once_with(
-                    owner="test", repo="test", title="Test"
-                )
-
-    def test_manual_retry_method_success(self):
+        ghapi, _ = gh_mocks
+        ghapi.pulls.create = Mock(return_value={"number": 123})
+
+        @with_rate_limit_handling(app)
+        def handle_pr():
+            client = app.get_client()
+            return client.pulls.create(owner="test", repo="test", title="Test")
+
+        result = handle_pr()
+        assert result["number"] == 123
+        ghapi.pulls.create.assert_called_once_with(
+            owner="test", repo="test", title="Test"
+        )
+
+    def test_manual_retry_method_success(self, app):
         """Test the manual retry_with_rate_limit method with successful calls."""
 
         def success_func(arg1, arg2, kwarg1=None):
             return f"success: {arg1} {arg2} {kwarg1}"
 
-        result = self.app.retry_with_rate_limit(
+        result = app.retry_with_rate_limit(
             success_func, "hello", "world", kwarg1="test"
         )
         assert result == "success: hello world test"
 
-    def test_manual_retry_method_with_rate_limit(self):
+    def test_manual_retry_method_with_rate_limit(self, app, sleeps):
         """Test the manual retry_with_rate_limit method with rate limit errors."""
         call_count = 0
 
@@ -85,22 +127,41 @@ class TestRateLimitHandling:
                 raise error
             return "success after retry"
 
-        with patch("time.sleep") as mock_sleep:
-            result = self.app.retry_with_rate_limit(rate_limit_func)
-            assert result == "success after retry"
-            assert call_count == 2
-            mock_sleep.assert_called_once_with(1)
+        result = app.retry_with_rate_limit(rate_limit_func)
+        assert result == "success after retry"
+        assert call_count == 2
+        assert sleeps == [1]
+
+    @pytest.mark.anyio
+    async def test_async_retry_method_with_rate_limit(self, app, async_sleeps):
+        """Test async_retry_with_rate_limit awaits the call and backs off with asyncio.sleep."""
+        call_count = 0
+
+        async def rate_limit_func():
+            nonlocal call_count
+            call_count += 1
+            if call_count == 1:
+                error = Exception("Rate limited")
+                error.code = 429
+                error.headers = {"retry-after": "1"}
+                raise error
+            return "success after retry"
+
+        result = await app.async_retry_with_rate_limit(rate_limit_func)
+        assert result == "success after retry"
+        assert call_count == 2
+        assert async_sleeps == [1]
 
-    def test_manual_retry_method_non_rate_limit_error(self):
+    def test_manual_retry_method_non_rate_limit_error(self, app):
         """Test that non-rate-limit errors are not retried."""
 
         def error_func():
             raise ValueError("Not a rate limit error")
 
         with pytest.raises(ValueError, match="Not a rate limit error"):
-            self.app.retry_with_rate_limit(error_func)
+            app.retry_with_rate_limit(error_func)
 
-    def test_rate_limit_error_max_retries(self):
+    def test_rate_limit_error_max_retries(self, app):
         """Test that rate limit errors respect max retries."""
         call_count = 0
 
@@ -112,93 +173,68 @@ class TestRateLimitHandling:
             error.headers = {"retry-after": "1"}
             raise error
 
-        with patch("time.sleep"):
-            with pytest.raises(Exception) as exc_info:
-                self.app.retry_with_rate_limit(always_rate_limited)
+        with pytest.raises(Exception) as exc_info:
+            app.retry_with_rate_limit(always_rate_limited)
 
-            # Should have tried 3 times total (initial + 2 retries)
-            assert call_count == 3
-            # Should raise GitHubRateLimitError
-            assert "GitHubRateLimitError" in str(type(exc_info.value))
+        # Should have tried 3 times total (initial + 2 retries)
+        assert call_count == 3
+        # Should raise GitHubRateLimitError
+        assert "GitHubRateLimitError" in str(type(exc_info.value))
 
-    def test_get_client_alias(self):
+    def test_get_client_alias(self, app, gh_mocks):
         """Test that get_client is a proper alias for client method."""
-        mock_ghapi = Mock()
-
-        with patch("githubapp.core.GhApi", return_value=mock_ghapi):
-            with patch.object(self.app, "get_access_token") as mock_token:
-                mock_token.return_value.token = "fake-token"
-
-                client1 = self.app.client(123)
-                client2 = self.app.get_client(123)
+        client1 = app.client(123)
+        client2 = app.get_client(123)
 
-                # Both should return the same type of object
-                assert client1.__class__ is client2.__class__
+        # Both should return the same type of object
+        assert client1.__class__ is client2.__class__
 
-    def test_decorator_restores_original_methods(self):
+    def test_decorator_restores_original_methods(self, app, gh_mocks, mocker):
         """Test that the decorator properly restores original methods after execution."""
-        original_client = self.app.client
-        original_get_client = self.app.get_client
-
-        mock_ghapi = Mock()
-        mock_ghapi.repos = Mock()
-        mock_ghapi.repos.get = Mock(return_value={"name": "test-repo"})
-
-        with patch("githubapp.core.GhApi", return_value=mock_ghapi):
-            with patch.object(self.app, "get_access_token") as mock_token:
-                mock_token.return_value.token = "fake-token"
-
-                @self.app.on("repository.created")
-                @with_rate_limit_handling(self.app)
-                def handle_repo():
-                    client = self.app.get_client()
-                    return client.repos.get(owner="test", repo="test")
-
-                handle_repo()
+        original_client = app.client
+        original_get_client = app.get_client
 
-                # Methods should be restored
-                assert self.app.client == original_client
-                assert self.app.get_client == original_get_client
-
-    def test_rate_limit_detection_403_with_remaining_zero(self):
-        """Test rate limit detection for 403 responses with x-ratelimit-remaining=0."""
-
-        class MockResponse:
-            def __init__(self, status_code, headers):
-                self.status_code = status_code
-                self.headers = headers
-
-        # Test 403 with rate limit
-        response_403_rate_limit = MockResponse(403, {"x-ratelimit-remaining": "0"})
-        assert self.app._is_rate_limited(response_403_rate_limit)
-
-        # Test 403 without rate limit (e.g., permission denied)
-        response_403_permission = MockResponse(403, {"x-ratelimit-remaining": "100"})
-        assert not self.app._is_rate_limited(response_403_permission)
-
-        # Test 429 (always rate limit)
-        response_429 = MockResponse(429, {})
-        assert self.app._is_rate_limited(response_429)
-
-    def test_retry_delay_calculation(self):
+        # Nothing is asserted on the call, so a plain namespace is enough
+        ghapi = SimpleNamespace(
+            repos=SimpleNamespace(get=lambda **kwargs: {"name": "test-repo"})
+        )
+        mocker.patch("githubapp.core.GhApi", return_value=ghapi)
+
+        @with_rate_limit_handling(app)
+        def handle_repo():
+            client = app.get_client()
+            return client.repos.get(owner="test", repo="test")
+
+        handle_repo()
+
+        # Methods should be restored
+        assert app.client == original_client
+        assert app.get_client == original_get_client
+
+    @pytest.mark.parametrize(
+        "status, headers, expected",
+        [
+            (403, {"x-ratelimit-remaining": "0"}, True),
+            # 403 without rate limit (e.g., permission denied)
+            (403, {"x-ratelimit-remaining": "100"}, False),
+            (429, {}, True),
+        ],
+    )
+    def test_rate_limit_detection(self, app, status, headers, expected):
+        """Test rate limit detection for 403 and 429 responses."""
+        assert app._is_rate_limited(MockResponse(status, headers)) is expected
+
+    @pytest.mark.parametrize(
+        "headers, attempt, expected",
+        [
+            ({"retry-after": "30"}, 0, 30),
+            # frozen_time[0] + 45
+            ({"x-ratelimit-reset": "1700000045"}, 0, 45),
+            # 60 * 2^1 = 120, but capped by rate_limit_max_sleep=5
+            ({}, 1, 5),
+        ],
+    )
+    def test_retry_delay_calculation(self, app, headers, attempt, expected):
         """Test the retry delay calculation logic."""
-
-        class MockResponse:
-            def __init__(self, headers):
-                self.headers = headers
-
-        # Test with Retry-After header
-        response_with_retry_after = MockResponse({"retry-after": "30"})
-        delay = self.app._calculate_retry_delay(response_with_retry_after, 0)
-        assert delay == 30
-
-        # Test with x-ratelimit-reset header
-        future_time = int(time.time()) + 45
-        response_with_reset = MockResponse({"x-ratelimit-reset": str(future_time)})
-        delay = self.app._calculate_retry_delay(response_with_reset, 0)
-        assert 40 <= delay <= 50  # Should be around 45 seconds
-
-        # Test exponential backoff fallback
-        response_no_headers = MockResponse({})
-        delay = self.app._calculate_retry_delay(response_no_headers, 1)
-        assert delay == 5  # 60 * 2^1 = 120, but capped by rate_limit_max_sleep=5
+        response = MockResponse(headers=headers)
+        assert app._calculate_retry_delay(response, attempt) == expected
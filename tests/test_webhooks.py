@@ -0,0 +1,260 @@
+import asyncio
+import hashlib
+import hmac
+import orjson
+import pytest
+from githubapp.core import STATUS_FUNC_CALLED, STATUS_NO_FUNC_CALLED
+
+OPENED_ISSUE_BYTES = orjson.dumps(
+    {"action": "opened", "installation": {"id": 123}, "issue": {"number": 1}}
+)
+CLOSED_ISSUE_BYTES = orjson.dumps(
+    {"action": "closed", "installation": {"id": 123}, "issue": {"number": 1}}
+)
+WEBHOOK_HEADERS = {"Content-Type": "application/json", "X-GitHub-Event": "issues"}
+
+pytestmark = pytest.mark.anyio
+
+
+class TestGitHubAppWebhookHandling:
+    async def test_handle_request_missing_content_type(self, webhook):
+        _, _, client = webhook
+
+        response = await client.post("/webhooks/github/", json={"test": "data"})
+        assert response.status_code == 400
+
+    async def test_handle_request_missing_github_event_header(self, webhook):
+        _, _, client = webhook
+
+        response = await client.post(
+            "/webhooks/github/",
+            json={"installation": {"id": 123}},
+            headers={"Content-Type": "application/json"},
+        )
+        assert response.status_code == 400
+
+    async def test_handle_request_rejects_non_object_payload(self, webhook):
+        _, _, client = webhook
+
+        response = await client.post(
+            "/webhooks/github/", json=["installation"], headers=WEBHOOK_HEADERS
+        )
+        assert response.status_code == 400
+
+    async def test_handle_request_valid_webhook(self, webhook):
+        _, _, client = webhook
+
+        response = await client.post(
+            "/webhooks/github/",
+            content=OPENED_ISSUE_BYTES,
+            headers=WEBHOOK_HEADERS,
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["status"] == STATUS_FUNC_CALLED
+        assert "handle_opened_issue" in data["calls"]
+
+    async def test_handle_request_call_async_hook_function(self, webhook, with_hooks):
+        _, _, client = webhook
+
+        async def async_test_handler():
+            return "handled"
+
+        with with_hooks({"issues.opened": [async_test_handler]}):
+            response = await client.post(
+                "/webhooks/github/",
+                content=OPENED_ISSUE_BYTES,
+                headers=WEBHOOK_HEADERS,
+            )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["status"] == STATUS_FUNC_CALLED
+        assert "async_test_handler" in data["calls"]
+
+    @pytest.fixture
+    def signed(self, webhook, monkeypatch):
+        _, github_app, client = webhook
+        monkeypatch.setitem(github_app.config, "GITHUBAPP_WEBHOOK_SECRET", b"secret")
+        return github_app, client
+
+    @pytest.mark.parametrize(
+        "secret, algo, expected_status",
+        [
+            (b"secret", "sha256", 200),
+            (b"secret", "sha1", 200),
+            (b"wrong", "sha256", 400),
+            (b"wrong", "sha1", 400),
+        ],
+    )
+    async def test_handle_request_signature(
+        self, signed, secret, algo, expected_status
+    ):
+        _, client = signed
+        digest = hmac.new(secret, OPENED_ISSUE_BYTES, getattr(hashlib, algo))
+        header = "X-Hub-Signature-256" if algo == "sha256" else "X-Hub-Signature"
+
+        response = await client.post(
+            "/webhooks/github/",
+            content=OPENED_ISSUE_BYTES,
+            headers={**WEBHOOK_HEADERS, header: f"{algo}={digest.hexdigest()}"},
+        )
+        assert response.status_code == expected_status
+
+    async def test_handle_request_signature_follows_secret_change(self, signed):
+        github_app, client = signed
+
+        async def post(secret):
+            signature = hmac.new(secret, OPENED_ISSUE_BYTES, hashlib.sha256).hexdigest()
+            return await client.post(
+                "/webhooks/github/",
+                content=OPENED_ISSUE_BYTES,
+                headers={
+                    **WEBHOOK_HEADERS,
+                    "X-Hub-Signature-256": f"sha256={signature}",
+                },
+            )
+
+        assert (await post(b"secret")).status_code == 200
+        assert (await post(b"secret")).status_code == 200
+
+        github_app.config["GITHUBAPP_WEBHOOK_SECRET"] = b"rotated"
+        assert (await post(b"secret")).status_code == 400
+        assert (await post(b"rotated")).status_code == 200
+
+    @pytest.mark.parametrize(
+        "headers",
+        [
+            {},
+            {"X-Hub-Signature-256": "sha256=" + "0" * 64},
+            {"X-Hub-Signature": "sha1=" + "0" * 40},
+            {"X-Hub-Signature-256": "sha256=\u00e9"},
+        ],
+    )
+    async def test_handle_request_rejects_bad_signature(self, signed, headers):
+        _, client = signed
+
+        response = await client.post(
+            "/webhooks/github/",
+            content=OPENED_ISSUE_BYTES,
+            headers={
+                **WEBHOOK_HEADERS,
+                **{k: v.encode("latin-1") for k, v in headers.items()},
+            },
+        )
+        assert response.status_code == 400
+
+    async def test_handle_request_parses_webhook_event(self, webhook, with_hooks):
+        _, github_app, client = webhook
+        seen = []
+
+        def test_handler():
+            seen.append(github_app.webhook_event)
+
+        with with_hooks({"pull_request.opened": [test_handler]}):
+            response = await client.post(
+                "/webhooks/github/",
+                json={
+                    "action": "opened",
+                    "installation": {"id": 123},
+                    "repository": {"name": "repo", "owner": {"login": "octocat"}},
+                    "pull_request": {"number": 7},
+                },
+                headers={
+                    "Content-Type": "application/json",
+                    "X-GitHub-Event": "pull_request",
+                    "X-GitHub-Delivery": "abc-123",
+                },
+            )
+        assert response.status_code == 200
+
+        event = seen[0]
+        assert event.name == "pull_request"
+        assert event.action == "opened"
+        assert event.delivery_id == "abc-123"
+        assert event.installation_id == 123
+        assert event.owner == "octocat"
+        assert event.repo == "repo"
+        assert event.number == 7
+
+
+class TestGitHubAppIntegration:
+    async def test_concurrent_deliveries_see_their_own_event(self, webhook, with_hooks):
+        _, github_app, client = webhook
+        seen = []
+        started = []
+        both_started = asyncio.Event()
+
+        async def test_handler():
+            number = github_app.payload["issue"]["number"]
+            started.append(number)
+            if len(started) == 2:
+                both_started.set()
+            await both_started.wait()
+            seen.append(
+                (
+                    number,
+                    github_app.webhook_event.number,
+                    github_app.payload["issue"]["number"],
+                )
+            )
+
+        def deliver(number):
+            return client.post(
+                "/webhooks/github/",
+                content=orjson.dumps(
+                    {
+                        "action": "opened",
+                        "installation": {"id": 123},
+                        "issue": {"number": number},
+                    }
+                ),
+                headers=WEBHOOK_HEADERS,
+            )
+
+        with with_hooks({"issues.opened": [test_handler]}):
+            responses = await asyncio.gather(deliver(1), deliver(2))
+
+        assert [r.status_code for r in responses] == [200, 200]
+        assert sorted(seen) == [(1, 1, 1), (2, 2, 2)]
+
+    async def test_full_webhook_flow(self, webhook):
+        """Test complete webhook handling flow, with and without matching handlers"""
+        _, _, client = webhook
+
+        cases = [
+            (
+                WEBHOOK_HEADERS,
+                STATUS_FUNC_CALLED,
+                {
+                    "handle_any_issue": "handled_any",
+                    "handle_opened_issue": "handled_opened",
+                },
+            ),
+            (
+                {**WEBHOOK_HEADERS, "X-GitHub-Event": "pull_request"},
+                STATUS_NO_FUNC_CALLED,
+                {},
+            ),
+        ]
+        for headers, expected_status, expected_calls in cases:
+            event = headers["X-GitHub-Event"]
+            response = await client.post(
+                "/webhooks/github/", content=OPENED_ISSUE_BYTES, headers=headers
+            )
+
+            assert response.status_code == 200, f"case {event}"
+            data = response.json()
+            assert data["status"] == expected_status, f"case {event}"
+            assert data["calls"] == expected_calls, f"case {event}"
+
+    async def test_handler_exception_returns_500(self, webhook):
+        """Test that exceptions in handlers return 500"""
+        _, _, client = webhook
+
+        response = await client.post(
+            "/webhooks/github/",
+            content=CLOSED_ISSUE_BYTES,
+            headers=WEBHOOK_HEADERS,
+        )
+
+        assert response.status_code == 500